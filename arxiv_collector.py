@@ -2,18 +2,557 @@
 ArXiv Collector: fetch and cache recent AI papers via the ArXiv API.
 """
 
+import os
+import json
+import time
+import queue
+import random
+import hashlib
+import logging
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
 import arxiv
+import requests
+from requests.adapters import HTTPAdapter
 
-def fetch_recent_papers(category: str, max_results: int):
-    """Fetch recent papers for the given ArXiv category using the official API."""
-    client = arxiv.Client(page_size=100, delay_seconds=3, num_retries=3)
+# Re-exported: the id and metadata helpers used to live here
+import metrics
+from arxiv_metadata import paper_from_metadata, paper_metadata, parse_arxiv_id
+
+# ArXiv API terms of use: no more than one request every three seconds
+ARXIV_REQUEST_INTERVAL = 3.0
+# Responses that mean the API is overloaded: the request rate is backed off on these
+THROTTLE_STATUSES = (429, 503)
+
+class RateLimiter:
+    """Thread-safe token bucket; ``acquire`` blocks until a request may be made.
+
+    One limiter shared by every client keeps the combined request rate of all
+    concurrent workers within ``rate`` requests per second. The rate adapts
+    to the server: ``slow_down`` halves it after a 429 or 503, down to
+    ``min_factor`` of the configured rate, and each ``recover`` after a
+    successful request adds back a tenth of the configured rate.
+    """
+
+    def __init__(self, rate: Optional[float] = 1 / ARXIV_REQUEST_INTERVAL, capacity: float = 1.0,
+                 min_factor: float = 0.125):
+        self.rate = rate  # None disables limiting, e.g. against a local stand-in
+        self.base_rate = rate
+        self.min_rate = rate * min_factor if rate is not None else None
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the seconds waited."""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative reserves a future token, so waiters are served in arrival order.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def slow_down(self) -> None:
+        """Halve the request rate after the server signalled overload."""
+        if self.rate is None:
+            return
+        with self._lock:
+            rate = max(self.min_rate, self.rate / 2)
+            if rate < self.rate:
+                logging.info('ArXiv API is throttling; slowing to one request every %.1fs', 1 / rate)
+            self.rate = rate
+
+    def recover(self) -> None:
+        """Step the request rate back up towards the configured one after a successful request."""
+        if self.rate is None or self.rate >= self.base_rate:
+            return
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 10)
+
+
+_pooled_session = None
+
+def pooled_session() -> requests.Session:
+    """The process-wide keep-alive HTTP session every client shares.
+
+    Connections to the API (or a stand-in) are reused across pages,
+    categories and, in a long-running process, across runs, instead of each
+    client opening its own.
+    """
+    global _pooled_session
+    if _pooled_session is None:
+        _pooled_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        _pooled_session.mount('http://', adapter)
+        _pooled_session.mount('https://', adapter)
+    return _pooled_session
+
+
+@dataclass
+class RetryPolicy:
+    """How often a failed or unexpectedly empty page is retried, and how long to back off in between.
+
+    The delay before retry ``n`` (from 0) is drawn uniformly from zero up to
+    ``backoff_base * 2 ** n`` seconds, capped at ``backoff_max`` ("full
+    jitter"), so concurrent workers hitting the same outage spread their
+    retries out instead of failing again in lockstep.
+    """
+    retries: int = 5
+    backoff_base: float = 2.0
+    backoff_max: float = 60.0
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @classmethod
+    def from_config(cls, arxiv_cfg: dict) -> 'RetryPolicy':
+        return cls(retries=arxiv_cfg.get('retries', cls.retries),
+                   backoff_base=arxiv_cfg.get('backoff_base', cls.backoff_base),
+                   backoff_max=arxiv_cfg.get('backoff_max', cls.backoff_max))
+
+
+def _retryable(exc: Exception) -> bool:
+    """Server errors, throttling, empty pages and dropped connections are retried; other 4xx are not."""
+    status = getattr(exc, 'status', None)
+    return status is None or status >= 500 or status in THROTTLE_STATUSES
+
+
+class RateLimitedClient(arxiv.Client):
+    """``arxiv.Client`` whose requests, including retries, are paced by a shared ``RateLimiter``.
+
+    Failed pages are retried here rather than by the base client, with the
+    backoff of ``retry`` between attempts; 429 and 503 responses also slow
+    the shared limiter down for every worker.
+    """
+
+    def __init__(self, limiter: RateLimiter, page_size: int = 100, retry: Optional[RetryPolicy] = None,
+                 session: Optional[requests.Session] = None):
+        # The limiter replaces the client's own per-instance delay, and retry its immediate retries.
+        super().__init__(page_size=page_size, delay_seconds=0, num_retries=0)
+        self.limiter = limiter
+        self.retry = retry or _default_retry
+        self._session = session or pooled_session()
+
+    def _parse_feed(self, url, first_page=True, _try_index=0):
+        attempt = 0
+        while True:
+            metrics.add_time('rate_limit_wait', self.limiter.acquire())
+            metrics.count('api_requests')
+            # api_paging covers the requests themselves, failed ones included, not the waits between them
+            started = time.perf_counter()
+            try:
+                try:
+                    feed = super()._parse_feed(url, first_page=first_page, _try_index=attempt)
+                finally:
+                    metrics.add_time('api_paging', time.perf_counter() - started)
+                # The base client takes any empty first page for an empty result set, even one
+                # reporting results, so a transient empty page would silently drop a category
+                if not feed.results and feed.header.total_results > 0:
+                    raise arxiv.UnexpectedEmptyPageError(url, attempt, feed)
+                break
+            except (arxiv.HTTPError, arxiv.UnexpectedEmptyPageError,
+                    requests.exceptions.ConnectionError) as exc:
+                if getattr(exc, 'status', None) in THROTTLE_STATUSES:
+                    metrics.count('throttled_responses')
+                    self.limiter.slow_down()
+                if attempt >= self.retry.retries or not _retryable(exc):
+                    raise
+                delay = self.retry.delay(attempt)
+                logging.debug('Retrying %s in %.1fs (attempt %d): %s', url, delay, attempt + 1, exc)
+                metrics.count('fetch_retries')
+                metrics.add_time('backoff_wait', delay)
+                time.sleep(delay)
+                attempt += 1
+        self.limiter.recover()
+        metrics.count('pages_fetched')
+        return feed
+
+    def pages(self, search: arxiv.Search, offset: int = 0):
+        """Yield ``(offset, total_results, results)`` for each page of ``search``, starting at ``offset``."""
+        limit = search.max_results
+        first_page = offset == 0
+        while limit is None or offset < limit:
+            feed = self._parse_feed(self._format_url(search, offset, self.page_size), first_page=first_page)
+            if not feed.results:
+                return
+            total = feed.header.total_results
+            results = feed.results if limit is None else feed.results[:limit - offset]
+            yield offset, total, results
+            offset += len(feed.results)
+            if offset >= total:
+                return
+            first_page = False
+
+
+_default_limiter = RateLimiter()
+_default_retry = RetryPolicy()
+_default_client = None
+
+def default_client() -> RateLimitedClient:
+    """The process-wide client, created once and paced by the shared default limiter."""
+    global _default_client
+    if _default_client is None:
+        _default_client = RateLimitedClient(_default_limiter)
+    return _default_client
+
+def configure_collector(replay_url: Optional[str] = None,
+                        request_interval: float = ARXIV_REQUEST_INTERVAL,
+                        retry: Optional[RetryPolicy] = None) -> None:
+    """Point every client at ``replay_url`` (an ``arxiv_standin`` server) or back at the live API.
+
+    ``request_interval`` only applies in replay mode; the live API is always
+    paced at one request every ``ARXIV_REQUEST_INTERVAL`` seconds. ``retry``
+    replaces the default retry policy of every client created afterwards.
+    """
+    global _default_limiter, _default_retry, _default_client
+    if replay_url:
+        RateLimitedClient.query_url_format = replay_url.rstrip('/') + '/api/query?{}'
+        interval = request_interval
+        logging.info('Replay mode: ArXiv queries go to %s', replay_url)
+    else:
+        RateLimitedClient.query_url_format = arxiv.Client.query_url_format
+        if request_interval < ARXIV_REQUEST_INTERVAL:
+            logging.warning('request_interval %.1fs is below the ArXiv limit; using %.1fs',
+                            request_interval, ARXIV_REQUEST_INTERVAL)
+        interval = max(request_interval, ARXIV_REQUEST_INTERVAL)
+    _default_limiter = RateLimiter(1 / interval if interval > 0 else None)
+    _default_retry = retry or RetryPolicy()
+    _default_client = None
+
+@dataclass
+class HighWaterMark:
+    """Newest submission seen for a category: its timestamp and the ids submitted at exactly that time."""
+    published: str
+    entry_ids: List[str] = field(default_factory=list)
+
+    def stop_at(self, paper) -> bool:
+        """True once paging (newest first) has reached papers older than the mark."""
+        return paper.published < datetime.datetime.fromisoformat(self.published)
+
+    def seen(self, paper) -> bool:
+        return (paper.published == datetime.datetime.fromisoformat(self.published)
+                and parse_arxiv_id(paper.entry_id)[0] in self.entry_ids)
+
+
+class FetchState:
+    """Per-category high-water marks persisted as JSON between runs."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.marks: Dict[str, HighWaterMark] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.marks = {cat: HighWaterMark(**mark) for cat, mark in json.load(f).items()}
+
+    def get(self, category: str) -> Optional[HighWaterMark]:
+        return self.marks.get(category)
+
+    def advance(self, category: str, papers) -> None:
+        """Move the category's mark up to the newest of ``papers``."""
+        mark = self.marks.get(category)
+        for paper in papers:
+            published = paper.published.isoformat()
+            base_id = parse_arxiv_id(paper.entry_id)[0]
+            if mark is None or paper.published > datetime.datetime.fromisoformat(mark.published):
+                mark = HighWaterMark(published, [base_id])
+            elif published == mark.published and base_id not in mark.entry_ids:
+                # A fresh mark, so one handed to a running fetch is never changed under it
+                mark = HighWaterMark(published, mark.entry_ids + [base_id])
+        if mark is not None:
+            self.marks[category] = mark
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({cat: asdict(mark) for cat, mark in self.marks.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class PageJournal:
+    """The pages of one query fetched so far, appended to a JSONL file as each one arrives.
+
+    The first line identifies the query and when it was started; every
+    further line is one page, ``{"offset", "total", "records"}``, flushed
+    and fsynced before its papers are handed on. A journal left behind by a
+    failed run is replayed by the next attempt at the same query, which then
+    resumes paging at the first offset not saved. A torn last line, from a
+    crash mid-write, is dropped, as is a journal older than ``max_age``.
+    """
+
+    def __init__(self, path: str, key: str, max_age: Optional[datetime.timedelta] = None):
+        self.path = path
+        self.key = key
+        self.records: List[dict] = []
+        self.total: Optional[int] = None
+        self._file = None
+        if os.path.exists(path):
+            self._load(max_age)
+
+    @property
+    def offset(self) -> int:
+        """The offset of the first page not yet saved."""
+        return len(self.records)
+
+    def complete(self, max_results: Optional[int]) -> bool:
+        """True when the saved pages already hold every result of the query."""
+        if self.total is None:
+            return False
+        return self.offset >= (self.total if max_results is None else min(self.total, max_results))
+
+    def papers(self):
+        return [paper_from_metadata(record) for record in self.records]
+
+    def append(self, offset: int, total: int, results) -> None:
+        if offset != self.offset:
+            raise ValueError(f'Page at offset {offset} does not follow the {self.offset} results saved')
+        records = [paper_metadata(paper) for paper in results]
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fresh = not os.path.exists(self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if fresh:
+                self._write({'query': self.key, 'started': datetime.datetime.now().isoformat()})
+        self._write({'offset': offset, 'total': total, 'records': records})
+        self.records.extend(records)
+        self.total = total
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _write(self, entry: dict) -> None:
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _load(self, max_age: Optional[datetime.timedelta]) -> None:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        started = header.get('started')
+        if header.get('query') != self.key or started is None or (
+                max_age is not None and datetime.datetime.now() - datetime.datetime.fromisoformat(started) > max_age):
+            logging.info('Discarding stale page journal %s', self.path)
+            os.remove(self.path)
+            return
+        intact = 1
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line) if line.endswith('\n') else None
+            except ValueError:
+                entry = None
+            if entry is None or entry.get('offset') != self.offset:
+                break
+            self.records.extend(entry['records'])
+            self.total = entry['total']
+            intact += 1
+        if intact < len(lines):
+            # Cut a torn last line off, so the next page is appended after the last intact one
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.writelines(lines[:intact])
+
+
+class PageJournals:
+    """The page journals of one run, one per query, under ``directory``.
+
+    ``clear`` deletes the journals of queries that completed once their
+    papers are safely processed; a failed category's journal is kept for the
+    next attempt.
+    """
+
+    def __init__(self, directory: str, max_age_hours: float = 12):
+        self.directory = directory
+        self.max_age = datetime.timedelta(hours=max_age_hours) if max_age_hours else None
+        self.journals: Dict[str, PageJournal] = {}
+        self._lock = threading.Lock()
+
+    def open(self, category: str, client: arxiv.Client, search: arxiv.Search) -> PageJournal:
+        # Keyed by everything that decides which results land at which offset
+        key = client._format_url(search, 0, client.page_size)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        path = os.path.join(self.directory, f"{category.replace('/', '_')}-{digest}.jsonl")
+        journal = PageJournal(path, key, self.max_age)
+        with self._lock:
+            self.journals[category] = journal
+        return journal
+
+    def clear(self, keep: Iterable[str] = ()) -> None:
+        keep = set(keep)
+        with self._lock:
+            for category, journal in list(self.journals.items()):
+                if category in keep:
+                    journal.close()
+                else:
+                    journal.discard()
+                del self.journals[category]
+
+
+def open_page_journals(config: dict) -> Optional[PageJournals]:
+    """The page journals under ``arxiv.page_journal_dir``, or None when it is empty."""
+    arxiv_cfg = config.get('arxiv', {})
+    directory = arxiv_cfg.get('page_journal_dir', 'cache/pages')
+    if not directory:
+        return None
+    return PageJournals(directory, arxiv_cfg.get('page_journal_max_age_hours', 12))
+
+
+def date_range_query(category: str, start: datetime.date, end: datetime.date) -> str:
+    """Query for papers in ``category`` submitted from ``start`` through ``end`` inclusive (UTC days)."""
+    return f"cat:{category} AND submittedDate:[{start:%Y%m%d}0000 TO {end:%Y%m%d}2359]"
+
+def iter_recent_papers(category: str, max_results: int, since: Optional[HighWaterMark] = None,
+                       client: Optional[RateLimitedClient] = None,
+                       date_range: Optional[Tuple[datetime.date, datetime.date]] = None,
+                       journals: Optional[PageJournals] = None):
+    """Yield recent papers for the given ArXiv category as each API page arrives.
+
+    With ``since``, paging stops at the first paper older than the high-water
+    mark, so routine runs only request the pages holding new submissions.
+    With ``date_range`` only papers submitted within those days are queried.
+    Work done by the consumer between pages counts towards the 3-second
+    request interval, so analysis overlaps the rate-limit wait instead of
+    adding to it. With ``journals`` every page is saved as it arrives, and
+    pages saved by an earlier, failed attempt are replayed instead of fetched.
+    """
+    if client is None:
+        client = default_client()
     search = arxiv.Search(
-        query=f"cat:{category}",
+        query=date_range_query(category, *date_range) if date_range else f"cat:{category}",
         max_results=max_results,
         sort_by=arxiv.SortCriterion.SubmittedDate,
         sort_order=arxiv.SortOrder.Descending,
     )
-    results = []
-    for paper in client.results(search):
-        results.append(paper)
-    return results
\ No newline at end of file
+    for paper in _fetched_papers(category, client, search, journals):
+        if since is not None:
+            if since.stop_at(paper):
+                return
+            if since.seen(paper):
+                continue
+        yield paper
+
+def _fetched_papers(category: str, client: RateLimitedClient, search: arxiv.Search,
+                    journals: Optional[PageJournals]):
+    if journals is None:
+        for _, _, results in client.pages(search):
+            yield from results
+        return
+    journal = journals.open(category, client, search)
+    if journal.offset:
+        logging.info('Resuming %s at result %d from page journal %s', category, journal.offset, journal.path)
+        metrics.count('journal_papers_replayed', journal.offset)
+        yield from journal.papers()
+        if journal.complete(search.max_results):
+            return
+    for offset, total, results in client.pages(search, journal.offset):
+        journal.append(offset, total, results)
+        yield from results
+
+def fetch_recent_papers(category: str, max_results: int, since: Optional[HighWaterMark] = None):
+    """Fetch recent papers for the given ArXiv category using the official API."""
+    return list(iter_recent_papers(category, max_results, since=since))
+
+def iter_category_papers(categories: Iterable[str], max_results: int,
+                         since: Optional[Dict[str, HighWaterMark]] = None,
+                         limiter: Optional[RateLimiter] = None,
+                         on_fetch: Optional[Callable[[str, object], None]] = None,
+                         buffer_size: int = 200,
+                         date_range: Optional[Tuple[datetime.date, datetime.date]] = None,
+                         journals: Optional[PageJournals] = None,
+                         on_error: Optional[Callable[[str, Exception], None]] = None):
+    """Fetch several categories concurrently and yield each distinct paper once, as pages arrive.
+
+    Each category is paged by its own worker thread and client, all sharing
+    one ``RateLimiter`` so the combined request rate stays within the ArXiv
+    limit. Cross-listed papers are merged by base ArXiv id: the first copy
+    to arrive is yielded and later copies are dropped. ``on_fetch`` is
+    called in the consuming thread for every fetched (category, paper),
+    duplicates included, e.g. to advance per-category high-water marks.
+    ``date_range`` restricts every category to the same submission days and
+    ``journals`` saves each page to disk as it arrives. A category that
+    still fails after its retries stops the whole fetch, unless ``on_error``
+    is given: it is then called with the category and the error, and the
+    other categories carry on.
+    """
+    categories = list(dict.fromkeys(categories))
+    since = since or {}
+    limiter = limiter or _default_limiter
+    results: queue.Queue = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker(category: str) -> None:
+        try:
+            client = RateLimitedClient(limiter)
+            for paper in iter_recent_papers(category, max_results, since.get(category), client=client,
+                                            date_range=date_range, journals=journals):
+                if not put((category, paper)):
+                    return
+            put((category, done))
+        except Exception as exc:  # surfaced to the consumer, which re-raises it
+            put((category, exc))
+
+    seen_ids = set()
+    pending = len(categories)
+    executor = ThreadPoolExecutor(max_workers=max(1, pending), thread_name_prefix='arxiv-fetch')
+    try:
+        for category in categories:
+            executor.submit(worker, category)
+        while pending:
+            category, item = results.get()
+            if item is done:
+                pending -= 1
+                logging.debug('Finished fetching category %s', category)
+                continue
+            if isinstance(item, Exception):
+                if on_error is None:
+                    raise item
+                pending -= 1
+                metrics.count('categories_failed')
+                on_error(category, item)
+                continue
+            if on_fetch is not None:
+                on_fetch(category, item)
+            base_id = parse_arxiv_id(item.entry_id)[0]
+            if base_id in seen_ids:
+                metrics.count('cross_list_duplicates')
+                continue
+            seen_ids.add(base_id)
+            metrics.count('papers_fetched')
+            yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
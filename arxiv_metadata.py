@@ -0,0 +1,64 @@
+"""
+ArXiv Metadata: parse ArXiv ids and convert paper metadata to and from JSON records, without the API client.
+"""
+
+import re
+import datetime
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+_ARXIV_ID_RE = re.compile(r'(?:.*/abs/)?(?P<base>.+?)(?:v(?P<version>\d+))?$')
+
+
+@dataclass
+class RecordedAuthor:
+    name: str
+
+
+@dataclass
+class RecordedPaper:
+    """A paper rebuilt from a metadata record, carrying the ``arxiv.Result`` fields the pipeline reads."""
+    entry_id: str
+    title: str
+    summary: str
+    published: datetime.datetime
+    updated: datetime.datetime
+    authors: List[RecordedAuthor] = field(default_factory=list)
+    primary_category: str = ''
+    categories: List[str] = field(default_factory=list)
+    pdf_url: Optional[str] = None
+
+
+def parse_arxiv_id(entry_id: str) -> Tuple[str, int]:
+    """Split an entry id or URL such as ``http://arxiv.org/abs/2401.01234v2`` into ``('2401.01234', 2)``."""
+    match = _ARXIV_ID_RE.match(entry_id.strip())
+    version = match.group('version')
+    return match.group('base'), int(version) if version else 1
+
+def paper_metadata(paper) -> dict:
+    """Serialize the raw ArXiv metadata the pipeline uses into a JSON-friendly dict."""
+    return {
+        'entry_id': paper.entry_id,
+        'title': paper.title,
+        'summary': paper.summary,
+        'authors': [a.name for a in paper.authors],
+        'published': paper.published.isoformat(),
+        'updated': paper.updated.isoformat(),
+        'primary_category': getattr(paper, 'primary_category', ''),
+        'categories': list(getattr(paper, 'categories', [])),
+        'pdf_url': getattr(paper, 'pdf_url', None),
+    }
+
+def paper_from_metadata(record: dict) -> RecordedPaper:
+    """Inverse of ``paper_metadata``."""
+    return RecordedPaper(
+        entry_id=record['entry_id'],
+        title=record['title'],
+        summary=record['summary'],
+        published=datetime.datetime.fromisoformat(record['published']),
+        updated=datetime.datetime.fromisoformat(record['updated']),
+        authors=[RecordedAuthor(name) for name in record.get('authors', [])],
+        primary_category=record.get('primary_category', ''),
+        categories=list(record.get('categories', [])),
+        pdf_url=record.get('pdf_url'),
+    )
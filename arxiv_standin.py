@@ -0,0 +1,285 @@
+"""
+ArXiv Stand-in: local server that answers ArXiv API queries from recorded or synthetic papers.
+
+Serves the same ``/api/query`` endpoint, query syntax and paging shape the
+``arxiv`` client uses, with configurable latency and error injection, so the
+pipeline can be benchmarked and regression-tested without network access.
+
+Usage:
+    python arxiv_standin.py --port 8765 --papers 2000 --latency 0.2 --error-rate 0.05
+    python main.py --run --replay http://127.0.0.1:8765
+"""
+
+import re
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape, quoteattr
+
+from arxiv_metadata import paper_metadata
+from synthetic_corpus import iter_papers
+
+_CATEGORY_RE = re.compile(r'cat:([\w.\-]+)')
+_DATE_RANGE_RE = re.compile(r'submittedDate:\[(\d{8,14})\s+TO\s+(\d{8,14})\]')
+_ATOM_SCHEME = 'http://arxiv.org/schemas/atom'
+
+
+def synthetic_records(count: int, categories: Iterable[str] = ('cs.AI',), seed: int = 0,
+                      cross_list_rate: float = 0.2, **corpus_options) -> List[dict]:
+    """Synthetic papers as metadata records, spread over ``categories`` with some cross-listing."""
+    categories = list(categories)
+    rng = random.Random(seed)
+    records = []
+    for i, paper in enumerate(iter_papers(count, seed=seed, **corpus_options)):
+        record = paper_metadata(paper)
+        primary = categories[i % len(categories)]
+        record['primary_category'] = primary
+        record['categories'] = [primary]
+        if len(categories) > 1 and rng.random() < cross_list_rate:
+            record['categories'].append(rng.choice([c for c in categories if c != primary]))
+        records.append(record)
+    return records
+
+
+def load_records(path: str) -> List[dict]:
+    """Load recorded papers from a JSONL file of metadata records or from a paper-cache database."""
+    if path.endswith('.db'):
+        conn = sqlite3.connect(path)
+        try:
+            return [json.loads(row[0]) for row in conn.execute('SELECT metadata FROM papers')]
+        finally:
+            conn.close()
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ArxivStandIn:
+    """Threaded HTTP stand-in for ``export.arxiv.org/api/query``.
+
+    ``latency`` (plus up to ``jitter``) seconds are added to every response.
+    With probability ``error_rate`` a request fails with ``error_status``, and
+    with probability ``empty_rate`` a page comes back with no entries, which is
+    how the real API misbehaves under load. The random draws are seeded, so a
+    sequential client sees the same faults on every run. ``outage_after``
+    simulates a longer outage: every request after that many fails with
+    ``error_status``, for ``outage_length`` requests or, if None, until
+    ``outage_after`` is reset.
+    """
+
+    def __init__(self, records: List[dict], host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, empty_rate: float = 0.0, seed: int = 0,
+                 outage_after: Optional[int] = None, outage_length: Optional[int] = None):
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.empty_rate = empty_rate
+        self.outage_after = outage_after
+        self.outage_length = outage_length
+        self.stats = {'requests': 0, 'errors': 0, 'empty_pages': 0, 'entries_served': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._result_sets = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'ArxivStandIn':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='arxiv-standin', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'ArxivStandIn':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def respond(self, query: dict):
+        """Return ``(status, body, delay)`` for the parsed query-string parameters."""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self._in_outage() or self._rng.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return self.error_status, b'Service Unavailable', delay
+            empty = self._rng.random() < self.empty_rate
+        search_query = query.get('search_query', [''])[0]
+        sort_by = query.get('sortBy', ['relevance'])[0]
+        sort_order = query.get('sortOrder', ['descending'])[0]
+        start = int(query.get('start', ['0'])[0] or 0)
+        page_size = int(query.get('max_results', ['10'])[0] or 10)
+
+        matches = self._result_set(search_query, sort_by, sort_order)
+        page = [] if empty else matches[start:start + page_size]
+        with self._lock:
+            self.stats['empty_pages'] += empty
+            self.stats['entries_served'] += len(page)
+        return 200, _atom_feed(search_query, page, len(matches), start, page_size), delay
+
+    def _in_outage(self) -> bool:
+        if self.outage_after is None or self.stats['requests'] <= self.outage_after:
+            return False
+        return self.outage_length is None or self.stats['requests'] <= self.outage_after + self.outage_length
+
+    def _result_set(self, search_query: str, sort_by: str, sort_order: str) -> List[dict]:
+        key = (search_query, sort_by, sort_order)
+        with self._lock:
+            cached = self._result_sets.get(key)
+        if cached is not None:
+            return cached
+        categories = set(_CATEGORY_RE.findall(search_query))
+        date_range = _DATE_RANGE_RE.search(search_query)
+        matches = []
+        for record in self.records:
+            if categories and categories.isdisjoint(record.get('categories') or [record['primary_category']]):
+                continue
+            if date_range and not _in_range(record['published'], *date_range.groups()):
+                continue
+            matches.append(record)
+        field = 'updated' if sort_by == 'lastUpdatedDate' else 'published'
+        matches.sort(key=lambda r: (r[field], r['entry_id']), reverse=sort_order != 'ascending')
+        with self._lock:
+            self._result_sets[key] = matches
+        return matches
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path.rstrip('/') != '/api/query':
+                    self.send_error(404)
+                    return
+                status, body, delay = standin.respond(parse_qs(parsed.query))
+                if delay > 0:
+                    time.sleep(delay)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/atom+xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                logging.debug('arxiv stand-in: ' + fmt, *args)
+
+        return Handler
+
+
+def _in_range(published: str, low: str, high: str) -> bool:
+    stamp = datetime.datetime.fromisoformat(published).strftime('%Y%m%d%H%M%S')
+    return low.ljust(14, '0') <= stamp <= high.ljust(14, '9')
+
+
+def _atom_time(value: str) -> str:
+    dt = datetime.datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(datetime.timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _atom_entry(record: dict) -> str:
+    entry_id = record['entry_id']
+    pdf_url = record.get('pdf_url') or entry_id.replace('/abs/', '/pdf/')
+    parts = [
+        '  <entry>',
+        f'    <id>{escape(entry_id)}</id>',
+        f'    <updated>{_atom_time(record["updated"])}</updated>',
+        f'    <published>{_atom_time(record["published"])}</published>',
+        f'    <title>{escape(record["title"])}</title>',
+        f'    <summary>{escape(record["summary"])}</summary>',
+    ]
+    parts.extend(f'    <author><name>{escape(name)}</name></author>' for name in record.get('authors', []))
+    parts.extend([
+        f'    <link href={quoteattr(entry_id)} rel="alternate" type="text/html"/>',
+        f'    <link title="pdf" href={quoteattr(pdf_url)} rel="related" type="application/pdf"/>',
+        f'    <arxiv:primary_category term={quoteattr(record["primary_category"])} scheme="{_ATOM_SCHEME}"/>',
+    ])
+    parts.extend(
+        f'    <category term={quoteattr(cat)} scheme="{_ATOM_SCHEME}"/>'
+        for cat in record.get('categories') or [record['primary_category']]
+    )
+    parts.append('  </entry>')
+    return '\n'.join(parts)
+
+
+def _atom_feed(search_query: str, page: List[dict], total: int, start: int, page_size: int) -> bytes:
+    now = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        f'xmlns:arxiv="{_ATOM_SCHEME}">',
+        '  <id>http://arxiv.org/api/standin</id>',
+        f'  <title>arXiv Query: {escape(search_query)}</title>',
+        f'  <updated>{now}</updated>',
+        f'  <opensearch:totalResults>{total}</opensearch:totalResults>',
+        f'  <opensearch:startIndex>{start}</opensearch:startIndex>',
+        f'  <opensearch:itemsPerPage>{page_size}</opensearch:itemsPerPage>',
+    ]
+    lines.extend(_atom_entry(record) for record in page)
+    lines.append('</feed>')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local ArXiv API stand-in for offline runs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--records', help='JSONL file of recorded paper metadata, or a paper-cache .db')
+    parser.add_argument('--papers', type=int, default=1000, help='Synthetic papers to serve when no --records')
+    parser.add_argument('--categories', nargs='+', default=['cs.AI', 'cs.CL', 'cs.LG', 'cs.MA', 'stat.ML'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='Fraction of pages returned empty')
+    parser.add_argument('--outage-after', type=int, help='Fail every request after this many')
+    parser.add_argument('--outage-length', type=int, help='Requests the outage lasts (default: until restarted)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)-8s %(message)s')
+    if args.records:
+        records = load_records(args.records)
+    else:
+        records = synthetic_records(args.papers, args.categories, seed=args.seed)
+    standin = ArxivStandIn(
+        records, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, empty_rate=args.empty_rate,
+        seed=args.seed, outage_after=args.outage_after, outage_length=args.outage_length,
+    )
+    logging.info('Serving %d papers at %s/api/query', len(records), standin.url)
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Backfill: split a historical date range into windows and checkpoint progress after each one.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import datetime
+from typing import Iterable, List, Tuple
+
+from content_analyzer import ScoredPaper
+
+Window = Tuple[datetime.date, datetime.date]
+
+
+def date_windows(start: datetime.date, end: datetime.date, days: int = 7) -> List[Window]:
+    """Consecutive ``(first, last)`` day ranges of at most ``days`` days covering ``start``..``end`` inclusive."""
+    if end < start:
+        raise ValueError(f'Backfill range ends ({end}) before it starts ({start})')
+    if days < 1:
+        raise ValueError('Backfill windows must span at least one day')
+    windows = []
+    first = start
+    while first <= end:
+        last = min(first + datetime.timedelta(days=days - 1), end)
+        windows.append((first, last))
+        first = last + datetime.timedelta(days=1)
+    return windows
+
+
+class BackfillCheckpoint:
+    """Progress of one backfill, saved as JSON after every completed window.
+
+    Besides the finished windows it keeps the running top N (ranking fields
+    and abstract, enough to rebuild the write-up lazily) and the counters, so
+    a resumed backfill produces the same report as an uninterrupted one. A
+    checkpoint only applies to the exact range, categories and window size it
+    was started with.
+    """
+
+    def __init__(self, path: str, params: dict):
+        self.path = path
+        self.params = params
+        self.completed: List[str] = []
+        self.top: List[ScoredPaper] = []
+        self.counts = {'fetched': 0, 'relevant': 0}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('params') == params:
+                self.completed = saved['completed']
+                self.top = [ScoredPaper(**entry) for entry in saved['top']]
+                self.counts = saved['counts']
+            else:
+                logging.warning('Ignoring backfill checkpoint %s: it was started with other settings', path)
+
+    @classmethod
+    def for_range(cls, directory: str, start: datetime.date, end: datetime.date,
+                  categories: Iterable[str], window_days: int) -> 'BackfillCheckpoint':
+        params = {'from': start.isoformat(), 'to': end.isoformat(),
+                  'categories': sorted(categories), 'window_days': window_days}
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+        return cls(os.path.join(directory, f'backfill_{start}_{end}_{digest}.json'), params)
+
+    def is_done(self, window: Window) -> bool:
+        return window[0].isoformat() in self.completed
+
+    def complete(self, window: Window, top: Iterable[ScoredPaper], counts: dict) -> None:
+        """Record ``window`` as finished along with the top N and counters so far, and save."""
+        self.completed.append(window[0].isoformat())
+        self.top = list(top)
+        self.counts = dict(counts)
+        self.save()
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        payload = {
+            'params': self.params,
+            'completed': self.completed,
+            'counts': self.counts,
+            'top': [dict(paper.scored_fields(), summary=paper.summary) for paper in self.top],
+        }
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        self.completed, self.top = [], []
+        self.counts = {'fetched': 0, 'relevant': 0}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,3 @@
+"""
+Benchmarks: standalone performance measurements, run from the repository root with ``python -m benchmarks.<name>``.
+"""
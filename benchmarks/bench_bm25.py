@@ -0,0 +1,105 @@
+"""
+Benchmark: batched BM25 scoring vs. the per-paper keyword scorer, for throughput and ranking quality.
+
+Throughput is measured on the usual synthetic corpus. Quality is measured on
+a labeled one: strongly relevant papers (keywords in the title and several in
+the abstract, label 2), weakly relevant ones (a single keyword in the
+abstract, label 1) and decoys whose words merely contain a keyword ("storage",
+"Albert", "reagent"; label 0). Papers are ranked by score alone.
+
+Usage:
+    python -m benchmarks.bench_bm25 --papers 100000
+"""
+
+import math
+import time
+import random
+import argparse
+import dataclasses
+
+from bm25_scorer import BM25Scorer, iter_scored_batches
+from content_analyzer import AI_KEYWORDS, iter_scored
+from synthetic_corpus import generate_papers
+
+DECOY_WORDS = ['storage', 'leverage', 'average', 'coverage', 'fragment', 'paragraph', 'drag',
+               'albert', 'robert', 'reagent']
+
+
+def labeled_corpus(count: int, seed: int = 0):
+    """Papers and their relevance labels: 20% strong, 30% weak, 50% decoys."""
+    rng = random.Random(seed)
+    papers, labels = [], []
+    for i, paper in enumerate(generate_papers(count, seed=seed, keyword_density=0)):
+        kind = i % 10
+        title = paper.title.split()
+        summary = paper.summary.split()
+        if kind < 2:
+            title.insert(rng.randrange(len(title) + 1), rng.choice(AI_KEYWORDS).title())
+            extra, label = rng.choices(AI_KEYWORDS, k=3), 2
+        elif kind < 5:
+            extra, label = [rng.choice(AI_KEYWORDS)], 1
+        else:
+            title.insert(rng.randrange(len(title) + 1), rng.choice(DECOY_WORDS).title())
+            extra, label = rng.choices(DECOY_WORDS, k=4), 0
+        for word in extra:
+            summary.insert(rng.randrange(len(summary) + 1), word)
+        papers.append(dataclasses.replace(paper, title=' '.join(title), summary=' '.join(summary)))
+        labels.append(label)
+    return papers, labels
+
+
+def ndcg(ranked_labels, all_labels, k: int) -> float:
+    def dcg(labels):
+        return sum((2 ** label - 1) / math.log2(i + 2) for i, label in enumerate(labels[:k]))
+    ideal = dcg(sorted(all_labels, reverse=True))
+    return dcg(ranked_labels) / ideal if ideal else 0.0
+
+
+def quality(scored, papers, labels, ks) -> dict:
+    label_of = {paper.entry_id: label for paper, label in zip(papers, labels)}
+    ranked = sorted(scored, key=lambda s: -s.score)
+    flagged = [label_of[s.url] for s in ranked]
+    relevant = sum(1 for label in labels if label > 0)
+    result = {
+        'precision': sum(1 for label in flagged if label > 0) / len(flagged) if flagged else 0.0,
+        'recall': sum(1 for label in flagged if label > 0) / relevant if relevant else 0.0,
+    }
+    for k in ks:
+        result[f'ndcg@{k}'] = ndcg(flagged, labels, k)
+    return result
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--papers', type=int, default=100000)
+    parser.add_argument('--labeled', type=int, default=20000, help='Papers in the labeled quality corpus')
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--k', type=int, nargs='+', default=[100, 5000, 10000])
+    args = parser.parse_args()
+
+    papers = generate_papers(args.papers)
+    keyword_time, keyword = _timed(lambda: list(iter_scored(papers)))
+    bm25_time, bm25 = _timed(lambda: list(iter_scored_batches(papers, BM25Scorer(), args.chunk_size)))
+    print(f'{args.papers} papers')
+    print(f'keyword scorer   {keyword_time:8.3f}s  {args.papers / keyword_time:10.0f} papers/s  {len(keyword)} relevant')
+    print(f'bm25 (batched)   {bm25_time:8.3f}s  {args.papers / bm25_time:10.0f} papers/s  {len(bm25)} relevant'
+          f'  x{keyword_time / bm25_time:.2f}')
+
+    papers, labels = labeled_corpus(args.labeled)
+    print(f'\nranking quality on {args.labeled} labeled papers (50% decoys)')
+    header = ['precision', 'recall'] + [f'ndcg@{k}' for k in args.k]
+    print(f'{"":<16}' + ''.join(f'{name:>11}' for name in header))
+    for name, scored in (('keyword scorer', iter_scored(papers)),
+                         ('bm25', iter_scored_batches(papers, BM25Scorer(), args.chunk_size))):
+        result = quality(list(scored), papers, labels, args.k)
+        print(f'{name:<16}' + ''.join(f'{result[column]:>11.3f}' for column in header))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: MinHash/LSH deduplication throughput and accuracy on a corpus with injected duplicates.
+
+Usage:
+    python -m benchmarks.bench_dedup --papers 100000 --duplicate-rate 0.05
+"""
+
+import time
+import random
+import argparse
+import dataclasses
+
+from dedup import NEAR_DUPLICATE, UNIQUE, VERSION, Deduplicator
+from synthetic_corpus import FILLER_WORDS, generate_papers
+
+
+def with_duplicates(papers, rate: float, edit_rate: float, seed: int = 0):
+    """Interleave lightly edited copies (new ids) and re-versioned copies (same id) of earlier papers."""
+    rng = random.Random(seed)
+    out, near, versions = [], set(), set()
+    for i, paper in enumerate(papers):
+        out.append(paper)
+        if i and rng.random() < rate:
+            original = out[rng.randrange(len(out))]
+            if rng.random() < 0.5:
+                words = original.summary.split()
+                for _ in range(max(1, int(len(words) * edit_rate))):
+                    words[rng.randrange(len(words))] = rng.choice(FILLER_WORDS)
+                copy_id = f'http://arxiv.org/abs/9999.{len(near):05d}v1'
+                out.append(dataclasses.replace(original, entry_id=copy_id, summary=' '.join(words)))
+                near.add(copy_id)
+            else:
+                copy_id = original.entry_id.rsplit('v', 1)[0] + 'v9'
+                out.append(dataclasses.replace(original, entry_id=copy_id))
+                versions.add(copy_id)
+    return out, near, versions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--papers', type=int, default=100000)
+    parser.add_argument('--duplicate-rate', type=float, default=0.05)
+    parser.add_argument('--edit-rate', type=float, default=0.03, help='Fraction of words changed in near-duplicates')
+    parser.add_argument('--threshold', type=float, default=0.7)
+    args = parser.parse_args()
+
+    corpus, near, versions = with_duplicates(generate_papers(args.papers), args.duplicate_rate, args.edit_rate)
+    dedup = Deduplicator(threshold=args.threshold)
+    flagged = {VERSION: set(), NEAR_DUPLICATE: set()}
+    start = time.perf_counter()
+    for paper in corpus:
+        outcome, _ = dedup.check(paper)
+        if outcome != UNIQUE:
+            flagged[outcome].add(paper.entry_id)
+    elapsed = time.perf_counter() - start
+
+    true_near = flagged[NEAR_DUPLICATE] & near
+    print(f'{len(corpus):,} papers in {elapsed:.2f}s ({1e6 * elapsed / len(corpus):.1f} us/paper)')
+    print(f'versions:        {len(flagged[VERSION] & versions)}/{len(versions)} caught, '
+          f'{len(flagged[VERSION] - versions)} false positives')
+    print(f'near-duplicates: {len(true_near)}/{len(near)} caught '
+          f'(recall {len(true_near) / max(len(near), 1):.3f}), '
+          f'{len(flagged[NEAR_DUPLICATE] - near)} false positives')
+
+
+if __name__ == '__main__':
+    main()
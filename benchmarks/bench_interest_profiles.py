@@ -0,0 +1,71 @@
+"""
+Benchmark: ranking every interest profile from one shared scan vs. one scan per profile.
+
+The per-profile baseline is what running the pipeline once per team costs
+in scanning alone: the default keywords plus one matcher per profile, each
+reading every paper. Both produce the same rankings.
+
+Usage:
+    python -m benchmarks.bench_interest_profiles --papers 50000
+"""
+
+import time
+import argparse
+
+import yaml
+
+from content_analyzer import iter_scored
+from interest_profiles import InterestProfiles
+from ranking_engine import RankingEngine, rank_analyses
+from synthetic_corpus import generate_papers
+
+
+def shared(papers, profiles_cfg, engine, top_n):
+    profiles = InterestProfiles(profiles_cfg, engine, top_n)
+    scored = (s for s in map(profiles.score_paper, profiles.observe(papers)) if s is not None)
+    return rank_analyses(scored, top_n, engine), profiles.ranked()
+
+
+def separate(papers, profiles_cfg, engine, top_n):
+    by_profile = {}
+    for name, profile in profiles_cfg.items():
+        single = InterestProfiles({name: profile}, engine, top_n)
+        for _ in single.observe(papers):
+            pass
+        by_profile.update(single.ranked())
+    return rank_analyses(iter_scored(papers), top_n, engine), by_profile
+
+
+def _ids(result):
+    ranked, by_profile = result
+    return [p.arxiv_id for p in ranked], {name: [p.arxiv_id for p in top] for name, top in by_profile.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--papers', type=int, default=50000)
+    parser.add_argument('--config', default='config.yaml', help='Config whose interests.profiles are used')
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    profiles_cfg = config.get('interests', {}).get('profiles') or {}
+    top_n = config.get('ranking', {}).get('top_n', 20)
+    engine = RankingEngine.from_config(config.get('ranking', {}))
+    papers = generate_papers(args.papers)
+
+    results = {}
+    for name, fn in (('one scan per profile', separate), ('shared scan', shared)):
+        start = time.perf_counter()
+        results[name] = _ids(fn(papers, profiles_cfg, engine, top_n))
+        results[name + ' time'] = time.perf_counter() - start
+    base = results['one scan per profile time']
+    for name in ('one scan per profile', 'shared scan'):
+        elapsed = results[name + ' time']
+        print(f'{name:<22}{elapsed:8.3f}s  {args.papers / elapsed:10.0f} papers/s  x{base / elapsed:.2f}')
+    same = results['shared scan'] == results['one scan per profile']
+    print(f'{len(profiles_cfg)} profiles plus the default ranking; rankings {"identical" if same else "DIFFER"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: compiled KeywordMatcher vs. the per-keyword substring loop it replaced.
+
+Usage:
+    python -m benchmarks.bench_keyword_matcher --papers 20000
+"""
+
+import argparse
+import time
+
+import keyword_matcher
+from content_analyzer import AI_KEYWORDS
+from keyword_matcher import KeywordMatcher
+from synthetic_corpus import generate_papers
+
+
+def legacy_is_relevant(paper) -> bool:
+    text = f"{paper.title} {paper.summary}".lower()
+    return any(keyword.lower() in text for keyword in AI_KEYWORDS)
+
+
+def legacy_score(paper) -> int:
+    title_text = paper.title.lower()
+    summary_text = paper.summary.lower()
+    score = 0
+    for keyword in AI_KEYWORDS:
+        kw = keyword.lower()
+        if kw in title_text:
+            score += 3
+        elif kw in summary_text:
+            score += 1
+    return score
+
+
+def run_legacy(papers):
+    return [(legacy_is_relevant(p), legacy_score(p)) for p in papers]
+
+
+def run_matcher(matcher, papers):
+    results = []
+    for p in papers:
+        hits = matcher.scan(p.title, p.summary)
+        results.append((bool(hits.text), matcher.score(hits)))
+    return results
+
+
+def _best_of(repeat, fn, *args):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--papers', type=int, default=20000)
+    parser.add_argument('--density', type=float, default=0.02, help='Fraction of abstract words that are keywords')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    papers = generate_papers(args.papers, keyword_density=args.density)
+    legacy_time, expected = _best_of(args.repeat, run_legacy, papers)
+    print(f'legacy loop           {legacy_time:8.3f}s  {len(papers) / legacy_time:10.0f} papers/s')
+
+    backends = [('substring', None)]
+    if keyword_matcher.ahocorasick is not None:
+        backends.insert(0, ('aho-corasick', keyword_matcher.ahocorasick))
+    for name, module in backends:
+        saved = keyword_matcher.ahocorasick
+        keyword_matcher.ahocorasick = module
+        try:
+            matcher = KeywordMatcher(AI_KEYWORDS)
+        finally:
+            keyword_matcher.ahocorasick = saved
+        elapsed, got = _best_of(args.repeat, run_matcher, matcher, papers)
+        status = 'identical' if got == expected else 'MISMATCH'
+        print(f'matcher ({name:<12}) {elapsed:8.3f}s  {len(papers) / elapsed:10.0f} papers/s'
+              f'  x{legacy_time / elapsed:.2f}  results {status}')
+
+
+if __name__ == '__main__':
+    main()
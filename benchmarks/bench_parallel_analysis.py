@@ -0,0 +1,45 @@
+"""
+Benchmark: serial scoring vs. the process-pool scorer at increasing worker counts.
+
+Usage:
+    python -m benchmarks.bench_parallel_analysis --papers 100000 --workers 1 2 4 8 16 32
+"""
+
+import os
+import time
+import argparse
+
+from content_analyzer import iter_scored
+from parallel_analyzer import CHUNK_SIZE, iter_scored_parallel
+from synthetic_corpus import generate_papers
+
+
+def _fields(scored):
+    return [s.scored_fields() for s in scored]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--papers', type=int, default=100000)
+    parser.add_argument('--density', type=float, default=0.02, help='Fraction of abstract words that are keywords')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    papers = generate_papers(args.papers, keyword_density=args.density)
+    print(f'{os.cpu_count()} CPUs, {len(papers):,} papers, chunks of {args.chunk_size}')
+    start = time.perf_counter()
+    expected = _fields(iter_scored(papers))
+    serial = time.perf_counter() - start
+    print(f'serial            {serial:8.3f}s  {len(papers) / serial:10.0f} papers/s')
+    for workers in args.workers:
+        start = time.perf_counter()
+        got = _fields(iter_scored_parallel(papers, workers, chunk_size=args.chunk_size))
+        elapsed = time.perf_counter() - start
+        status = 'identical' if got == expected else 'MISMATCH'
+        print(f'{workers:>3} worker(s)     {elapsed:8.3f}s  {len(papers) / elapsed:10.0f} papers/s'
+              f'  x{serial / elapsed:.2f}  results {status}')
+
+
+if __name__ == '__main__':
+    main()
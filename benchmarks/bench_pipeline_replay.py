@@ -0,0 +1,69 @@
+"""
+Benchmark: end-to-end run_pipeline throughput against a local ArXiv stand-in, with no network.
+
+Usage:
+    python -m benchmarks.bench_pipeline_replay --papers 5000 --max-results 1000 --latency 0.05
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+
+import yaml
+
+from arxiv_standin import ArxivStandIn, synthetic_records
+from main import run_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--papers', type=int, default=5000, help='Papers served by the stand-in')
+    parser.add_argument('--max-results', type=int, default=1000, help='max_results per category')
+    parser.add_argument('--categories', nargs='+', default=['cs.AI', 'cs.CL', 'cs.LG', 'cs.MA', 'stat.ML'])
+    parser.add_argument('--latency', type=float, default=0.0, help='Stand-in response latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--request-interval', type=float, default=0.0, help='Client pacing in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cfg_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml')
+    with open(cfg_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    records = synthetic_records(args.papers, args.categories, seed=args.seed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, \
+            ArxivStandIn(records, latency=args.latency, error_rate=args.error_rate, seed=args.seed) as standin:
+        # Every state path in config.yaml (search index, report index, metrics, page journals, ...) is
+        # relative, so running inside workdir keeps the synthetic papers out of the real cache/
+        os.chdir(workdir)
+        config['arxiv'].update(categories=args.categories, max_results=args.max_results,
+                               replay_url=standin.url, request_interval=args.request_interval,
+                               incremental=False)
+        config['cache'] = {'enabled': True, 'path': os.path.join(workdir, 'papers.db')}
+        config['report'] = {'output_dir': os.path.join(workdir, 'reports')}
+
+        # Cold: every paper analyzed. Warm: same fetch, analyses served from the paper cache.
+        results = {}
+        try:
+            for label, force_refresh in (('cold', True), ('warm', False)):
+                before = dict(standin.stats)
+                start = time.perf_counter()
+                run_pipeline(config, force_refresh=force_refresh)
+                elapsed = time.perf_counter() - start
+                served = standin.stats['entries_served'] - before['entries_served']
+                results[label] = {
+                    'seconds': round(elapsed, 3),
+                    'requests': standin.stats['requests'] - before['requests'],
+                    'papers': served,
+                    'papers_per_second': round(served / elapsed, 1),
+                }
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: search-index build cost while scoring, and query latency over the indexed corpus.
+
+Usage:
+    python -m benchmarks.bench_search_index --papers 200000
+"""
+
+import os
+import time
+import argparse
+import datetime
+import tempfile
+import statistics
+
+from content_analyzer import score_paper
+from search_index import SearchIndex
+from synthetic_corpus import iter_papers
+
+QUERIES = [
+    'rag',
+    '"long context"',
+    'agent*',
+    'chain-of-thought',
+    'multimodal AND safety',
+    'prompt NOT agent',
+    'retrieval-augmented generation',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--papers', type=int, default=200000)
+    parser.add_argument('--density', type=float, default=0.02, help='Fraction of abstract words that are keywords')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(os.path.join(tmp, 'search.db'))
+        scoring = indexing = 0.0
+        for paper in iter_papers(args.papers, keyword_density=args.density):
+            start = time.perf_counter()
+            scored = score_paper(paper)
+            middle = time.perf_counter()
+            index.add(paper, scored)
+            indexing += time.perf_counter() - middle
+            scoring += middle - start
+        start = time.perf_counter()
+        index.optimize()
+        optimize = time.perf_counter() - start
+        size = os.path.getsize(index.path)
+        print(f'{len(index):,} papers indexed: scoring {scoring:.1f}s, indexing {indexing:.1f}s '
+              f'(+{100 * indexing / scoring:.0f}%), optimize {optimize:.1f}s, {size / 2**20:.0f} MiB on disk')
+
+        since = datetime.date(2024, 12, 1)
+        for query in QUERIES:
+            for label, kwargs in (('', {}), (f'  since {since}', {'since': since})):
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    results = index.search(query, limit=args.limit, **kwargs)
+                    timings.append(time.perf_counter() - start)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+                print(f'{query + label:<44} median {1000 * statistics.median(timings):7.1f} ms  '
+                      f'p95 {1000 * p95:7.1f} ms  {len(results)} results')
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
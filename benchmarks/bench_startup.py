@@ -0,0 +1,97 @@
+"""
+Benchmark: cold-start latency of the CLI, each pipeline module's import time, and the --test dry run.
+
+Every measurement is a fresh interpreter, so nothing is cached between
+repeats except the operating system's file cache. Results are written as
+JSON to compare commits.
+
+Usage:
+    python -m benchmarks.bench_startup --repeat 10
+    python -m benchmarks.bench_startup --json benchmarks/results/startup.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ['main', 'arxiv_collector', 'content_analyzer', 'paper_cache', 'dedup', 'search_index',
+           'llm_analyzer', 'report_generator', 'scheduler']
+
+# The dry run, pointed at an empty scratch directory so it uses the synthetic sample and writes nothing here
+_DRY_RUN = """
+import logging
+logging.disable(logging.INFO)
+import main
+main.run_dry_run({{'cache': {{'path': {cache!r}}}, 'report': {{'output_dir': {out!r}}}}})
+"""
+
+
+def time_command(args, repeat: int) -> dict:
+    """Median and best wall time of ``python <args>`` over ``repeat`` fresh interpreters."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=_ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return {'median_ms': round(1000 * statistics.median(times), 1), 'best_ms': round(1000 * min(times), 1)}
+
+
+def import_breakdown(module: str, top: int):
+    """The ``top`` slowest imports (cumulative microseconds) when importing ``module``, from -X importtime."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=_ROOT,
+                            check=True, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>", children before parents
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if name.strip() == 'site':
+            rows = []  # interpreter startup, not the module's imports
+            continue
+        rows.append((int(cumulative), name.rstrip()))
+    total = next((us for us, name in rows if name.strip() == module), 0)
+    return total, sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='Slowest imports to list for main')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {'python': sys.version.split()[0]}
+    results['interpreter'] = time_command(['-c', 'pass'], args.repeat)
+    results['help'] = time_command(['main.py', '--help'], args.repeat)
+    with tempfile.TemporaryDirectory() as workdir:
+        script = _DRY_RUN.format(cache=os.path.join(workdir, 'none.db'), out=os.path.join(workdir, 'reports'))
+        results['dry_run'] = time_command(['-c', script], args.repeat)
+    results['imports_ms'] = {module: round(import_breakdown(module, 0)[0] / 1000, 1) for module in MODULES}
+
+    print(f"{'python -c pass':<28}{results['interpreter']['median_ms']:>8.1f} ms")
+    print(f"{'python main.py --help':<28}{results['help']['median_ms']:>8.1f} ms")
+    print(f"{'dry run (--test)':<28}{results['dry_run']['median_ms']:>8.1f} ms")
+    print('\nimport time (cumulative, own interpreter each):')
+    for module, ms in sorted(results['imports_ms'].items(), key=lambda item: -item[1]):
+        print(f'  {module:<26}{ms:>8.1f} ms')
+    print('\nslowest imports under "import main":')
+    for us, name in import_breakdown('main', args.top)[1]:
+        print(f'  {name:<40}{us / 1000:>8.1f} ms')
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
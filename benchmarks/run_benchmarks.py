@@ -0,0 +1,229 @@
+"""
+Benchmark suite: time and memory-profile each pipeline stage and the end-to-end run on synthetic corpora.
+
+Usage:
+    python -m benchmarks.run_benchmarks --scales 1k 10k 100k
+    python -m benchmarks.run_benchmarks --scales 1m --no-memory
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<old-commit>.json
+
+Results are written as JSON (one record per scale and stage) so runs on
+different commits can be compared with --compare.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import datetime
+import tempfile
+import subprocess
+import tracemalloc
+
+from content_analyzer import ScoredPaper, analyze_papers, iter_scored
+from ranking_engine import RankingEngine, rank_analyses
+from report_generator import generate_report
+from synthetic_corpus import generate_papers, iter_papers
+
+_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def parse_scale(text: str) -> int:
+    text = text.strip().lower()
+    if text[-1:] in _SUFFIXES:
+        return int(float(text[:-1]) * _SUFFIXES[text[-1]])
+    return int(text)
+
+
+def measure(fn, memory: bool = True):
+    """Run ``fn`` untraced for wall time, then again under tracemalloc for its peak allocation."""
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        del result
+        gc.collect()
+        tracemalloc.start()
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+class _Timed:
+    """Iterator wrapper accumulating the time spent producing items, upstream included."""
+
+    def __init__(self, iterable):
+        self._it = iter(iterable)
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            return next(self._it)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def bench_stages(n: int, args, output_dir: str, memory: bool):
+    """Each stage on its own, with materialized inputs built outside the timed region."""
+    corpus = generate_papers(n, seed=args.seed, keyword_density=args.density, abstract_words=args.abstract_words)
+    rows = []
+    # Full eager analysis of every relevant paper, for comparison with lazy scoring
+    seconds, peak, _ = measure(lambda: analyze_papers(corpus), memory)
+    rows.append(_row(n, 'analyze', seconds, peak, len(corpus)))
+    seconds, peak, scored = measure(lambda: list(iter_scored(corpus)), memory)
+    rows.append(_row(n, 'score', seconds, peak, len(corpus)))
+    seconds, peak, ranked = measure(lambda: rank_analyses(scored, args.top_n, RankingEngine()), memory)
+    rows.append(_row(n, 'rank', seconds, peak, len(scored)))
+    # Enrichment of the ranked papers happens here, on first access; a fresh copy keeps the passes equal
+    seconds, peak, _ = measure(lambda: generate_report(_fresh(ranked), output_dir), memory)
+    rows.append(_row(n, 'report', seconds, peak, len(ranked)))
+    return rows
+
+
+def bench_end_to_end(n: int, args, output_dir: str, memory: bool):
+    """Streaming generate -> score -> rank -> report, as run_pipeline wires it, with per-stage attribution."""
+    timers = {}
+
+    def run():
+        papers = _Timed(iter_papers(n, seed=args.seed, keyword_density=args.density,
+                                    abstract_words=args.abstract_words))
+        scored = _Timed(iter_scored(papers))
+        ranked = rank_analyses(scored, args.top_n, RankingEngine())
+        start = time.perf_counter()
+        generate_report(ranked, output_dir)
+        timers.update(generate=papers.seconds, score=scored.seconds - papers.seconds,
+                      report=time.perf_counter() - start)
+        return ranked
+
+    start = time.perf_counter()
+    run()
+    total = time.perf_counter() - start
+    breakdown = dict(timers)
+    breakdown['rank'] = total - sum(breakdown.values())
+    peak = measure(run, memory=True)[1] if memory else None
+    row = _row(n, 'end_to_end', total, peak, n)
+    row['breakdown_seconds'] = {k: round(v, 4) for k, v in breakdown.items()}
+    return [row]
+
+
+def _fresh(ranked):
+    """Copies of ranked papers with nothing enriched yet."""
+    copies = []
+    for paper in ranked:
+        copy = ScoredPaper(summary=paper.summary, **paper.scored_fields())
+        copy.rank = paper.rank
+        copies.append(copy)
+    return copies
+
+
+def _row(n: int, stage: str, seconds: float, peak, items: int) -> dict:
+    return {
+        'scale': n,
+        'stage': stage,
+        'seconds': round(seconds, 4),
+        'items': items,
+        'us_per_item': round(seconds / items * 1e6, 3) if items else None,
+        'peak_bytes': peak,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(_RESULTS_DIR), check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print per-stage time and memory ratios against a baseline; return how many regressed past threshold."""
+    old = {(r['scale'], r['stage']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\nvs {baseline['meta']['commit']}:")
+    for row in current['results']:
+        before = old.get((row['scale'], row['stage']))
+        if before is None:
+            continue
+        time_ratio = row['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        mem = ''
+        if row['peak_bytes'] and before.get('peak_bytes'):
+            mem = f"  memory x{row['peak_bytes'] / before['peak_bytes']:.2f}"
+        flag = ''
+        # Sub-10ms stages are dominated by timer noise; report them but never fail on them.
+        if time_ratio > threshold and before['seconds'] >= 0.01:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"  {row['scale']:>9,} {row['stage']:<11} time x{time_ratio:.2f}{mem}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', default=['1k', '10k', '100k'],
+                        help='Corpus sizes, e.g. 1k 10k 100k 1m')
+    parser.add_argument('--density', type=float, default=0.02, help='Fraction of abstract words that are AI keywords')
+    parser.add_argument('--abstract-words', type=int, default=180, help='Words per synthetic abstract')
+    parser.add_argument('--top-n', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-materialized', default='100k',
+                        help='Largest scale whose corpus is held in memory for per-stage runs; '
+                             'larger scales are measured end to end only')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc passes')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--fail-threshold', type=float, default=1.25,
+                        help='With --compare, exit non-zero if any stage is this many times slower')
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    max_materialized = parse_scale(args.max_materialized)
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for n in map(parse_scale, args.scales):
+            rows = bench_stages(n, args, output_dir, not args.no_memory) if n <= max_materialized else []
+            rows += bench_end_to_end(n, args, output_dir, not args.no_memory)
+            for row in rows:
+                peak = f"{row['peak_bytes'] / 2**20:9.1f} MiB" if row['peak_bytes'] is not None else ''
+                # A stage that produced nothing has no per-item time
+                per_item = f"{row['us_per_item']:10.2f}" if row['us_per_item'] is not None else f"{'-':>10}"
+                print(f"{row['scale']:>9,} {row['stage']:<11} {row['seconds']:9.3f}s "
+                      f"{per_item} us/item {peak}", flush=True)
+            results.extend(rows)
+
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': {'density': args.density, 'abstract_words': args.abstract_words,
+                       'top_n': args.top_n, 'seed': args.seed},
+        },
+        'results': results,
+    }
+    output = args.output or os.path.join(_RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {output}')
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.fail_threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""
+BM25 Scorer: score a batch of papers against the keyword taxonomy with one sparse matrix product.
+"""
+
+import os
+import json
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import metrics
+from content_analyzer import AI_KEYWORDS, GRADE_RULES, ScoredPaper
+from keyword_matcher import ahocorasick
+
+# Bytes that make up a word; anything else (spaces, punctuation, non-ASCII) separates words
+_WORD_CHARS = np.zeros(256, dtype=bool)
+_WORD_CHARS[list(b'abcdefghijklmnopqrstuvwxyz0123456789')] = True
+
+
+class CorpusStats:
+    """Document count, total length and per-keyword document frequency of every paper scored so far.
+
+    Kept in a JSON file so IDF and the average length come from the whole
+    history, not just the current batch. Papers scored again (new versions,
+    ``--force-refresh``) are counted again, which barely moves the ratios.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.docs = 0
+        self.length = 0.0
+        self.df: Dict[str, int] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.docs = data.get('docs', 0)
+            self.length = data.get('length', 0.0)
+            self.df = data.get('df', {})
+
+    def add(self, docs: int, length: float, df: Dict[str, int]) -> None:
+        self.docs += docs
+        self.length += length
+        for keyword, n in df.items():
+            self.df[keyword] = self.df.get(keyword, 0) + n
+
+    def idf(self, keywords: Sequence[str]) -> np.ndarray:
+        """Lucene's BM25 IDF, which stays positive for keywords in most documents."""
+        df = np.array([self.df.get(k, 0) for k in keywords], dtype=np.float64)
+        return np.log1p((self.docs - df + 0.5) / (df + 0.5))
+
+    @property
+    def avg_length(self) -> float:
+        return self.length / self.docs if self.docs else 1.0
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'docs': self.docs, 'length': self.length, 'df': dict(sorted(self.df.items()))}, f)
+        os.replace(tmp_path, self.path)
+
+
+class BM25Scorer:
+    """Keyword relevance by BM25 over whole words, computed for a batch of papers at once.
+
+    Keywords only match as whole words (a trailing plural "s" is allowed), so
+    "rag" no longer matches inside "storage" nor "bert" inside "Albert". How
+    often a keyword occurs counts, with diminishing returns (``k1``),
+    relative to the paper's length (``b``), and rare keywords weigh more than
+    ubiquitous ones. Title occurrences and length count ``title_weight``
+    times (BM25F). A paper is relevant if any keyword occurs in it.
+
+    Each batch is lowercased and joined into one string that a single
+    automaton pass searches for every keyword and grade trigger word; word
+    boundaries, per-field term frequencies and lengths are then worked out
+    with NumPy, and the scores are one sparse matrix-vector product. Grades
+    follow the same rules as the keyword scorer.
+    """
+
+    name = 'bm25'
+
+    def __init__(self, keywords: Iterable[str] = AI_KEYWORDS, k1: float = 1.2, b: float = 0.75,
+                 title_weight: float = 3.0, stats: Optional[CorpusStats] = None, update_stats: bool = True):
+        from scipy import sparse  # only needed when this scorer is configured
+
+        self._sparse = sparse
+        lowered = [k.lower() for k in keywords if k]
+        self.keywords = tuple(dict.fromkeys(lowered))
+        # A keyword listed twice weighs twice, as in the keyword scorer
+        self.weights = np.array([lowered.count(k) for k in self.keywords], dtype=np.float64)
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.stats = stats if stats is not None else CorpusStats()
+        self.update_stats = update_stats
+
+        # Every term searched for: keywords (whole words) and grade trigger words (substrings, as elsewhere)
+        triggers = [(word.lower(), rule) for rule, (words, _) in enumerate(GRADE_RULES) for word in words]
+        terms = list(dict.fromkeys(list(self.keywords) + [word for word, _ in triggers]))
+        index = {term: i for i, term in enumerate(terms)}
+        self._terms = terms
+        self._term_length = np.array([len(t) for t in terms], dtype=np.int64)
+        self._term_column = np.full(len(terms), -1, dtype=np.int64)
+        self._term_column[:len(self.keywords)] = np.arange(len(self.keywords))
+        self._term_rules = np.zeros(len(terms), dtype=np.int64)
+        for word, rule in triggers:
+            self._term_rules[index[word]] |= 1 << rule
+        self._rule_bonus = np.array([bonus for _, bonus in GRADE_RULES], dtype=np.int64)
+        self._automaton = None
+        self._patterns = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for i, term in enumerate(terms):
+                self._automaton.add_word(term, i)
+            self._automaton.make_automaton()
+        else:
+            self._patterns = [re.compile(re.escape(term)) for term in terms]
+
+    def signature(self) -> str:
+        """Identifies the scoring parameters, for the processed-paper cache fingerprint."""
+        return _signature(self.k1, self.b, self.title_weight)
+
+    def score_batch(self, papers: Sequence) -> List[Optional[Tuple[float, int]]]:
+        """BM25 score and grade of each paper, or None where no keyword occurs, in input order."""
+        started = time.perf_counter()
+        n = len(papers)
+        if n == 0:
+            return []
+        fields = []
+        for paper in papers:
+            fields.append(paper.title.lower())
+            fields.append(paper.summary.lower())
+        text = '\n'.join(fields)
+        field_start = np.zeros(2 * n, dtype=np.int64)
+        np.cumsum([len(f) + 1 for f in fields[:-1]], out=field_start[1:])
+        # Length in words, counted as the spaces and line breaks between them
+        field_words = np.fromiter((f.count(' ') + f.count('\n') + 1 if f else 0 for f in fields),
+                                  dtype=np.float64, count=2 * n)
+        # One byte per character (anything outside Latin-1 becomes "?"), to look up the characters around matches
+        chars = np.frombuffer(text.encode('latin-1', 'replace') + b'  ', dtype=np.uint8)
+
+        end, term = self._find(text)
+        start = end - self._term_length[term] + 1
+        field = np.searchsorted(field_start, start, side='right') - 1
+        doc = field // 2
+
+        # Grade: every trigger word counts wherever it occurs, as in the keyword scorer
+        rules = np.zeros(n, dtype=np.int64)
+        np.bitwise_or.at(rules, doc, self._term_rules[term])
+        grades = 5 + ((rules[:, None] >> np.arange(len(self._rule_bonus))) & 1) @ self._rule_bonus
+        grades += np.fromiter((len(p.authors) > 5 for p in papers), dtype=np.int64, count=n)
+        grades = np.clip(grades, 1, 10)
+
+        # Keywords must start and end on a word boundary; a plural "s" may follow
+        after = end + 1
+        plural = (chars[after] == ord('s')) & ~_WORD_CHARS[chars[after + 1]]
+        whole = ((start == 0) | ~_WORD_CHARS[chars[start - 1]]) & (~_WORD_CHARS[chars[after]] | plural)
+        keep = whole & (self._term_column[term] >= 0)
+        columns = len(self.keywords)
+        tf = self._sparse.csr_matrix(
+            (np.ones(int(keep.sum())), (field[keep], self._term_column[term[keep]])), shape=(2 * n, columns)
+        )
+        tf = self._sparse.csr_matrix(self.title_weight * tf[0::2] + tf[1::2])
+        tf.sum_duplicates()
+        length = self.title_weight * field_words[0::2] + field_words[1::2]
+
+        if self.update_stats:
+            df = np.bincount(tf.indices, minlength=columns)
+            self.stats.add(n, float(length.sum()), {k: int(c) for k, c in zip(self.keywords, df) if c})
+        idf = self.stats.idf(self.keywords)
+        rows = np.repeat(np.arange(n), np.diff(tf.indptr))
+        norm = self.k1 * (1 - self.b + self.b * length[rows] / self.stats.avg_length)
+        tf.data = tf.data * (self.k1 + 1) / (tf.data + norm)
+        scores = tf @ (idf * self.weights)
+        relevant = np.diff(tf.indptr) > 0
+
+        metrics.add_time('scoring', time.perf_counter() - started)
+        metrics.count('papers_scored', n)
+        metrics.count('papers_filtered', n - int(relevant.sum()))
+        return [(round(float(score), 3), int(grade)) if hit else None
+                for score, grade, hit in zip(scores, grades, relevant)]
+
+    def save(self) -> None:
+        if self.update_stats:
+            self.stats.save()
+
+    def _find(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """End offset and term index of every occurrence of every term, overlapping ones included."""
+        if self._automaton is not None:
+            found = np.array(list(self._automaton.iter(text)), dtype=np.int64).reshape(-1, 2)
+            return found[:, 0], found[:, 1]
+        ends, terms = [], []
+        for i, pattern in enumerate(self._patterns):
+            # Overlapping occurrences of a single term are not needed: one word cannot hold two
+            positions = [m.end() - 1 for m in pattern.finditer(text)]
+            ends.extend(positions)
+            terms.extend([i] * len(positions))
+        return np.array(ends, dtype=np.int64), np.array(terms, dtype=np.int64)
+
+
+def iter_scored_batches(papers: Iterable, scorer: BM25Scorer, chunk_size: int = 2000,
+                        lookup=None, store=None, on_scored=None) -> Iterator[ScoredPaper]:
+    """Like ``iter_scored``, scoring ``chunk_size`` papers at a time with ``scorer``.
+
+    ``lookup``, ``store`` and ``on_scored`` work as in
+    ``parallel_analyzer.iter_scored_parallel``; results keep the input order.
+    """
+    iterator = iter(papers)
+    while True:
+        chunk = []
+        for paper in iterator:
+            chunk.append(paper)
+            if len(chunk) >= chunk_size:
+                break
+        if not chunk:
+            return
+        known = [lookup(paper) if lookup is not None else (False, None) for paper in chunk]
+        results = iter(scorer.score_batch([paper for paper, (found, _) in zip(chunk, known) if not found]))
+        for paper, (found, scored) in zip(chunk, known):
+            if not found:
+                result = next(results)
+                scored = ScoredPaper.from_paper(paper, *result) if result is not None else None
+                if store is not None:
+                    store(paper, scored)
+            if on_scored is not None:
+                on_scored(paper, scored)
+            if scored is not None:
+                yield scored
+
+
+def open_scorer(config: dict, update_stats: bool = True) -> Optional[BM25Scorer]:
+    """The batch scorer named by ``analysis.scorer``; None for the default per-paper keyword scorer."""
+    bm25_cfg = _bm25_config(config)
+    if bm25_cfg is None:
+        return None
+    return BM25Scorer(
+        k1=bm25_cfg.get('k1', 1.2),
+        b=bm25_cfg.get('b', 0.75),
+        title_weight=bm25_cfg.get('title_weight', 3.0),
+        stats=CorpusStats(bm25_cfg.get('stats_path', 'cache/bm25_stats.json')),
+        update_stats=update_stats,
+    )
+
+
+def scorer_signature(config: dict) -> Optional[str]:
+    """``signature()`` of the scorer ``open_scorer`` would return, without building it."""
+    bm25_cfg = _bm25_config(config)
+    if bm25_cfg is None:
+        return None
+    return _signature(bm25_cfg.get('k1', 1.2), bm25_cfg.get('b', 0.75), bm25_cfg.get('title_weight', 3.0))
+
+
+def _bm25_config(config: dict) -> Optional[dict]:
+    analysis_cfg = config.get('analysis', {})
+    scorer = analysis_cfg.get('scorer', 'keyword')
+    if scorer == 'keyword':
+        return None
+    if scorer != 'bm25':
+        raise ValueError(f'Unknown scorer: {scorer}')
+    return analysis_cfg.get('bm25', {})
+
+
+def _signature(k1: float, b: float, title_weight: float) -> str:
+    return f'{BM25Scorer.name}:k1={k1}:b={b}:title={title_weight}'
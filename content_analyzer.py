@@ -2,8 +2,16 @@
 Content Analyzer: filter papers by keyword relevance and extract analysis metrics.
 """
 
+import json
+import time
+import hashlib
 from dataclasses import dataclass
-from typing import List
+from functools import cached_property
+from typing import Iterator, List, Optional, Tuple
+
+import metrics
+from arxiv_metadata import parse_arxiv_id
+from keyword_matcher import KeywordHits, KeywordMatcher
 
 @dataclass
 class PaperAnalysis:
@@ -18,9 +26,10 @@ class PaperAnalysis:
     business_applications: str = ""
     grade: int = 0
     justification: str = ""
-    arxiv_id: str = ""
+    arxiv_id: str = ""         # Base ArXiv id, without the version suffix
     url: str = ""
     score: int = 0
+    n_authors: int = 0
 
 # Default AI keywords for filtering and scoring
 AI_KEYWORDS = [
@@ -43,76 +52,244 @@ AI_KEYWORDS = [
     'evaluation', 'benchmark'
 ]
 
-def is_relevant_paper(paper) -> bool:
-    text = f"{paper.title} {paper.summary}".lower()
-    return any(keyword.lower() in text for keyword in AI_KEYWORDS)
-
-def calculate_relevance_score(paper) -> int:
-    title_text = paper.title.lower()
-    summary_text = paper.summary.lower()
-    score = 0
-    for keyword in AI_KEYWORDS:
-        kw = keyword.lower()
-        if kw in title_text:
-            score += 3
-        elif kw in summary_text:
-            score += 1
-    return score
+# Trigger words read by the analysis heuristics below, in rule order.
+RELEVANCE_RULES = [
+    (('agent', 'multi-agent', 'agentic'), "Advances AI agent architectures and autonomous system design"),
+    (('prompt', 'in-context', 'few-shot'), "Improves prompt engineering techniques and model interaction"),
+    (('context', 'memory', 'retrieval'), "Enhances context handling and memory management in AI systems"),
+    (('reasoning', 'planning', 'tool'), "Develops advanced reasoning and planning capabilities"),
+]
+USE_CASE_RULES = [
+    (('dialogue', 'conversation'), "Conversational AI and chatbot enhancement"),
+    (('code', 'programming'), "Automated code generation and software development"),
+    (('planning', 'decision'), "Decision support systems and strategic planning"),
+    (('vision', 'multimodal'), "Multimodal AI applications (vision + language)"),
+    (('search', 'retrieval'), "Enhanced search and information retrieval"),
+]
+BUSINESS_PROBLEM_RULES = [
+    (('efficien', 'optimiza'), "Operational efficiency and process optimization challenges"),
+    (('scale', 'scalab'), "Scalability issues in AI deployment"),
+    (('cost', 'resource'), "High computational cost and resource constraints"),
+]
+BUSINESS_APPLICATION_RULES = [
+    (('customer', 'service'), "Customer service automation and personalization platforms"),
+    (('analytics', 'analysis'), "Business intelligence and predictive analytics"),
+    (('content', 'generation'), "Automated content creation and marketing"),
+]
+GRADE_RULES = [
+    (('novel', 'breakthrough', 'significant'), 2),
+    (('efficient', 'scalable', 'practical'), 1),
+    (('benchmark', 'evaluation', 'comparison'), 1),
+]
+TRIGGER_WORDS = [
+    word
+    for rules in (RELEVANCE_RULES, USE_CASE_RULES, BUSINESS_PROBLEM_RULES,
+                  BUSINESS_APPLICATION_RULES, GRADE_RULES)
+    for words, _ in rules
+    for word in words
+]
 
-def analyze_papers(papers) -> List[PaperAnalysis]:
-    """Filter, score, and perform full analysis on a list of ArXiv papers."""
-    analyses: List[PaperAnalysis] = []
-    for paper in papers:
-        if not is_relevant_paper(paper):
-            continue
+# Bump when the heuristics change in a way the keyword and rule tables above don't capture
+ANALYZER_VERSION = 4
+
+def analysis_fingerprint(scorer: Optional[str] = None) -> str:
+    """Identify the current keyword list and scoring logic; cached analyses from another fingerprint are stale.
+
+    ``scorer`` is the signature of a batch scorer used instead of ``score_paper``, if any.
+    """
+    payload = json.dumps([
+        ANALYZER_VERSION, AI_KEYWORDS, RELEVANCE_RULES, USE_CASE_RULES,
+        BUSINESS_PROBLEM_RULES, BUSINESS_APPLICATION_RULES, GRADE_RULES,
+    ] + ([scorer] if scorer else []))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+# Compiled once; rebuild if AI_KEYWORDS or the rule tables are changed at runtime
+KEYWORD_MATCHER = KeywordMatcher(AI_KEYWORDS, extra_terms=TRIGGER_WORDS)
 
-        score = calculate_relevance_score(paper)
-        analysis = PaperAnalysis(
+@dataclass(frozen=True)
+class PaperFeatures:
+    """Everything the heuristics need from one paper, computed in a single text scan."""
+    hits: KeywordHits
+    n_authors: int = 0
+
+    @property
+    def terms(self):
+        """Keywords and trigger words found anywhere in the lowercased "title summary" text."""
+        return self.hits.text
+
+def extract_features(paper) -> PaperFeatures:
+    """Normalize the paper text once and collect every keyword and trigger-word hit."""
+    return PaperFeatures(
+        hits=KEYWORD_MATCHER.scan(paper.title, paper.summary),
+        n_authors=len(paper.authors),
+    )
+
+def match_keywords(paper) -> KeywordHits:
+    """Locate every AI keyword and trigger word in the paper's title and summary in one scan."""
+    return KEYWORD_MATCHER.scan(paper.title, paper.summary)
+
+def is_relevant_paper(paper, hits: Optional[KeywordHits] = None) -> bool:
+    if hits is None:
+        hits = match_keywords(paper)
+    return KEYWORD_MATCHER.has_keyword(hits)
+
+def calculate_relevance_score(paper, hits: Optional[KeywordHits] = None) -> int:
+    if hits is None:
+        hits = match_keywords(paper)
+    return KEYWORD_MATCHER.score(hits)
+
+class ScoredPaper:
+    """Ranking fields for one relevant paper, with the write-up filled in on first access.
+
+    Keyword score, grade, author count, date and ids are computed for every
+    paper that passes the filter. The enrichment fields (description,
+    relevance, use cases, business problems and applications, justification)
+    are only computed when first read, so papers that do not make the top N
+    never pay for them. ``to_analysis`` materializes a full ``PaperAnalysis``.
+    """
+
+    # Fields computed up front; everything else is derived from the text on demand
+    SCORED_FIELDS = ('title', 'date', 'arxiv_id', 'url', 'score', 'grade', 'n_authors')
+
+    def __init__(self, title: str, summary: str, date: str, arxiv_id: str, url: str,
+                 score: int, grade: int, n_authors: int = 0,
+                 features: Optional[PaperFeatures] = None):
+        self.rank = 0
+        self.title = title
+        self.summary = summary
+        self.date = date
+        self.arxiv_id = arxiv_id
+        self.url = url
+        self.score = score
+        self.grade = grade
+        self.n_authors = n_authors
+        if features is not None:
+            self.__dict__['features'] = features
+
+    @classmethod
+    def from_paper(cls, paper, score: int, grade: int,
+                   features: Optional[PaperFeatures] = None) -> 'ScoredPaper':
+        return cls(
             title=paper.title,
+            summary=paper.summary,
             date=paper.published.date().isoformat(),
-            description=_extract_description(paper.summary),
-            relevance=_assess_relevance(paper),
-            use_cases=_extract_use_cases(paper),
-            business_problems=_identify_business_problems(paper),
-            business_applications=_identify_business_applications(paper),
-            grade=_calculate_grade(paper),
-            justification=_grade_justification(paper, _calculate_grade(paper)),
-            arxiv_id=paper.entry_id.split('/')[-1],
+            arxiv_id=parse_arxiv_id(paper.entry_id)[0],
             url=paper.entry_id,
             score=score,
+            grade=grade,
+            n_authors=len(paper.authors),
+            features=features,
         )
-        analyses.append(analysis)
-    return analyses
+
+    def __repr__(self) -> str:
+        return f'ScoredPaper(arxiv_id={self.arxiv_id!r}, score={self.score}, grade={self.grade})'
+
+    @cached_property
+    def features(self) -> PaperFeatures:
+        return PaperFeatures(KEYWORD_MATCHER.scan(self.title, self.summary), self.n_authors)
+
+    @cached_property
+    def description(self) -> str:
+        return _extract_description(self.summary)
+
+    @cached_property
+    def relevance(self) -> str:
+        return _assess_relevance(self.features)
+
+    @cached_property
+    def use_cases(self) -> List[str]:
+        return _extract_use_cases(self.features)
+
+    @cached_property
+    def business_problems(self) -> str:
+        return _identify_business_problems(self.features)
+
+    @cached_property
+    def business_applications(self) -> str:
+        return _identify_business_applications(self.features)
+
+    @cached_property
+    def justification(self) -> str:
+        return _grade_justification(self.grade)
+
+    def scored_fields(self) -> dict:
+        return {name: getattr(self, name) for name in self.SCORED_FIELDS}
+
+    def to_analysis(self) -> PaperAnalysis:
+        """Run any enrichment not done yet and return the complete analysis."""
+        return PaperAnalysis(
+            rank=self.rank,
+            description=self.description,
+            relevance=self.relevance,
+            use_cases=self.use_cases,
+            business_problems=self.business_problems,
+            business_applications=self.business_applications,
+            justification=self.justification,
+            **self.scored_fields(),
+        )
+
+def score_features(features: PaperFeatures) -> Optional[Tuple[int, int]]:
+    """Keyword score and grade from a paper's features, or None if it has no AI keyword."""
+    if not KEYWORD_MATCHER.has_keyword(features.hits):
+        return None
+    return KEYWORD_MATCHER.score(features.hits), calculate_grade(features)
+
+def score_paper(paper, features: Optional[PaperFeatures] = None) -> Optional[ScoredPaper]:
+    """Filter and score a single ArXiv paper without enriching it; None if it is not relevant.
+
+    ``features`` is a scan of the paper already made, e.g. by ``interest_profiles``.
+    """
+    started = time.perf_counter()
+    if features is None:
+        features = extract_features(paper)
+    result = score_features(features)
+    metrics.add_time('scoring', time.perf_counter() - started)
+    metrics.count('papers_scored')
+    if result is None:
+        metrics.count('papers_filtered')
+        return None
+    return ScoredPaper.from_paper(paper, *result, features=features)
+
+def iter_scored(papers) -> Iterator[ScoredPaper]:
+    """Lazily filter and score papers from any iterable; enrichment waits until a field is read."""
+    for paper in papers:
+        scored = score_paper(paper)
+        if scored is not None:
+            yield scored
+
+def analyze_paper(paper) -> Optional[PaperAnalysis]:
+    """Filter, score, and fully analyze a single ArXiv paper; None if it is not relevant."""
+    scored = score_paper(paper)
+    return scored.to_analysis() if scored is not None else None
+
+def iter_analyses(papers) -> Iterator[PaperAnalysis]:
+    """Lazily filter and analyze papers from any iterable, yielding only the relevant ones."""
+    for paper in papers:
+        analysis = analyze_paper(paper)
+        if analysis is not None:
+            yield analysis
+
+def analyze_papers(papers) -> List[PaperAnalysis]:
+    """Filter, score, and perform full analysis on a list of ArXiv papers."""
+    return list(iter_analyses(papers))
 
 def _extract_description(abstract: str) -> str:
     sentences = abstract.split('.')[:3]
     return '. '.join(s.strip() for s in sentences if s).strip() + '.'
 
-def _assess_relevance(paper) -> str:
-    text = f"{paper.title} {paper.summary}".lower()
-    if any(w in text for w in ['agent', 'multi-agent', 'agentic']):
-        return "Advances AI agent architectures and autonomous system design"
-    if any(w in text for w in ['prompt', 'in-context', 'few-shot']):
-        return "Improves prompt engineering techniques and model interaction"
-    if any(w in text for w in ['context', 'memory', 'retrieval']):
-        return "Enhances context handling and memory management in AI systems"
-    if any(w in text for w in ['reasoning', 'planning', 'tool']):
-        return "Develops advanced reasoning and planning capabilities"
-    return "Contributes to foundational AI research and development"
-
-def _extract_use_cases(paper) -> List[str]:
-    text = f"{paper.title} {paper.summary}".lower()
-    cases = []
-    if 'dialogue' in text or 'conversation' in text:
-        cases.append("Conversational AI and chatbot enhancement")
-    if 'code' in text or 'programming' in text:
-        cases.append("Automated code generation and software development")
-    if 'planning' in text or 'decision' in text:
-        cases.append("Decision support systems and strategic planning")
-    if 'vision' in text or 'multimodal' in text:
-        cases.append("Multimodal AI applications (vision + language)")
-    if 'search' in text or 'retrieval' in text:
-        cases.append("Enhanced search and information retrieval")
+def _first_match(terms, rules, default: str) -> str:
+    for words, text in rules:
+        if not terms.isdisjoint(words):
+            return text
+    return default
+
+def _assess_relevance(features: PaperFeatures) -> str:
+    return _first_match(features.terms, RELEVANCE_RULES,
+                        "Contributes to foundational AI research and development")
+
+def _extract_use_cases(features: PaperFeatures) -> List[str]:
+    terms = features.terms
+    cases = [case for words, case in USE_CASE_RULES if not terms.isdisjoint(words)]
     # pad to at least 3 items
     defaults = ["Enterprise AI automation", "R&D acceleration", "Educational AI tutoring"]
     for d in defaults:
@@ -122,42 +299,27 @@ def _extract_use_cases(paper) -> List[str]:
             cases.append(d)
     return cases[:3]
 
-def _identify_business_problems(paper) -> str:
-    text = f"{paper.title} {paper.summary}".lower()
-    if 'efficien' in text or 'optimiza' in text:
-        return "Operational efficiency and process optimization challenges"
-    if 'scale' in text or 'scalab' in text:
-        return "Scalability issues in AI deployment"
-    if 'cost' in text or 'resource' in text:
-        return "High computational cost and resource constraints"
-    return "Complex decision-making and automation requirements"
-
-def _identify_business_applications(paper) -> str:
-    text = f"{paper.title} {paper.summary}".lower()
-    if 'customer' in text or 'service' in text:
-        return "Customer service automation and personalization platforms"
-    if 'analytics' in text or 'analysis' in text:
-        return "Business intelligence and predictive analytics"
-    if 'content' in text or 'generation' in text:
-        return "Automated content creation and marketing"
-    return "Enterprise AI integration and workflow automation"
-
-def _calculate_grade(paper) -> int:
-    text = f"{paper.title} {paper.summary}".lower()
+def _identify_business_problems(features: PaperFeatures) -> str:
+    return _first_match(features.terms, BUSINESS_PROBLEM_RULES,
+                        "Complex decision-making and automation requirements")
+
+def _identify_business_applications(features: PaperFeatures) -> str:
+    return _first_match(features.terms, BUSINESS_APPLICATION_RULES,
+                        "Enterprise AI integration and workflow automation")
+
+def calculate_grade(features: PaperFeatures) -> int:
+    terms = features.terms
     score = 5
-    if any(w in text for w in ['novel', 'breakthrough', 'significant']):
-        score += 2
-    if any(w in text for w in ['efficient', 'scalable', 'practical']):
-        score += 1
-    if any(w in text for w in ['benchmark', 'evaluation', 'comparison']):
-        score += 1
-    if len(paper.authors) > 5:
+    for words, bonus in GRADE_RULES:
+        if not terms.isdisjoint(words):
+            score += bonus
+    if features.n_authors > 5:
         score += 1
     return min(10, max(1, score))
 
-def _grade_justification(paper, grade: int) -> str:
+def _grade_justification(grade: int) -> str:
     if grade >= 8:
         return "High-impact research with significant practical applications and novel contributions."
     if grade >= 6:
         return "Solid research contribution with clear practical value and rigorous methodology."
-    return "Foundational research with potential long-term impact; may require additional development."
\ No newline at end of file
+    return "Foundational research with potential long-term impact; may require additional development."
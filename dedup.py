@@ -0,0 +1,168 @@
+"""
+Dedup: drop repeated versions of a paper and near-duplicate abstracts before analysis.
+"""
+
+import re
+import zlib
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from arxiv_metadata import parse_arxiv_id
+
+_WORD_RE = re.compile(r'\w+')
+# Odd 64-bit constant for folding consecutive word hashes into a shingle hash
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Outcomes of Deduplicator.check
+UNIQUE, VERSION, NEAR_DUPLICATE = 'unique', 'version', 'near_duplicate'
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """64-bit hashes of the overlapping ``size``-word shingles of the lowercased text.
+
+    Each word is hashed once and the hashes of consecutive words are combined
+    arithmetically, which avoids building a string per shingle. Text shorter
+    than ``size`` words is a single shingle; empty text has none.
+    """
+    words = _WORD_RE.findall(text.lower())
+    word_hashes = np.fromiter((zlib.crc32(w.encode('utf-8')) for w in words), dtype=np.uint64, count=len(words))
+    size = max(1, min(size, len(words)))
+    count = len(words) - size + 1
+    hashes = np.zeros(max(count, 0), dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * _SHINGLE_MULTIPLIER + word_hashes[offset:offset + count]
+    return hashes
+
+
+class MinHasher:
+    """MinHash signatures from shingle hashes with ``num_perm`` multiply-shift hash functions.
+
+    Every hash function is evaluated over all shingles at once in numpy, so a
+    signature costs a few vector operations rather than a Python loop over
+    shingles times permutations.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # Odd multipliers and random offsets; products wrap mod 2**64 and the top 32 bits are kept
+        self._a = (rng.integers(0, 2**63, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        mixed = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return mixed.min(axis=1).astype(np.uint32)
+
+
+class Deduplicator:
+    """Streaming duplicate filter keyed by base ArXiv id and by abstract similarity.
+
+    A paper whose base id was already seen (another version, or a cross-list
+    that reached the stream twice) is a ``version`` duplicate; the first copy
+    wins, which for the ArXiv API is the latest version. Otherwise its
+    abstract's MinHash signature is split into ``bands`` bands and looked up
+    in one hash table per band (locality-sensitive hashing), so only papers
+    sharing a band are compared, not every paper seen so far. A candidate
+    whose estimated Jaccard similarity reaches ``threshold`` makes the new
+    paper a ``near_duplicate`` of it.
+
+    Of two near-duplicates the earliest published (then lowest id) survives,
+    whichever category thread delivered it first. When that one arrives
+    second, the copy already let through is added to ``superseded`` for the
+    ranking to drop (see ``ranking_engine.drop_ranked``).
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f'num_perm ({num_perm}) must be a multiple of bands ({bands})')
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.counts = {UNIQUE: 0, VERSION: 0, NEAR_DUPLICATE: 0}
+        # Near-duplicate pairs found: (dropped base id, kept base id, estimated similarity)
+        self.pairs: List[Tuple[str, str, float]] = []
+        self.superseded: Set[str] = set()
+        self._seen_ids: Set[str] = set()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._order: Dict[str, tuple] = {}
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+
+    def check(self, paper) -> Tuple[str, Optional[str]]:
+        """Classify ``paper`` and remember it if unique; returns ``(outcome, base id it duplicates)``."""
+        base_id = parse_arxiv_id(paper.entry_id)[0]
+        if base_id in self._seen_ids:
+            self.counts[VERSION] += 1
+            return VERSION, base_id
+        self._seen_ids.add(base_id)
+
+        hashes = shingle_hashes(paper.summary, self.shingle_size)
+        if not len(hashes):
+            self.counts[UNIQUE] += 1
+            return UNIQUE, None
+        signature = self.hasher.signature(hashes)
+        keys = [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+        match, similarity = self._best_candidate(signature, keys)
+        order = (paper.published, base_id)
+        if match is not None and self._order[match] <= order:
+            self.counts[NEAR_DUPLICATE] += 1
+            self.pairs.append((base_id, match, similarity))
+            return NEAR_DUPLICATE, match
+        if match is not None:
+            logging.debug('%s supersedes its near-duplicate %s', base_id, match)
+            self.superseded.add(match)
+            self.counts[NEAR_DUPLICATE] += 1
+            self.counts[UNIQUE] -= 1
+            self.pairs.append((match, base_id, similarity))
+        self._signatures[base_id] = signature
+        self._order[base_id] = order
+        for bucket, key in zip(self._buckets, keys):
+            bucket[key].append(base_id)
+        self.counts[UNIQUE] += 1
+        return UNIQUE, None
+
+    def _best_candidate(self, signature: np.ndarray, keys: List[bytes]):
+        best, best_similarity = None, 0.0
+        checked = set()
+        for bucket, key in zip(self._buckets, keys):
+            for candidate in bucket.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= self.threshold and similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+        return best, best_similarity
+
+    def filter(self, papers: Iterable, on_skipped: Optional[Callable] = None) -> Iterator:
+        """Yield only the papers that are neither another version nor a near-duplicate of an earlier one.
+
+        ``on_skipped(paper)`` is called for each near-duplicate held back;
+        another version shares its base id with the copy passed on.
+        """
+        for paper in papers:
+            outcome, original = self.check(paper)
+            if outcome == UNIQUE:
+                yield paper
+            elif outcome == NEAR_DUPLICATE:
+                logging.debug('Skipping %s: near-duplicate of %s', paper.entry_id, original)
+                if on_skipped is not None:
+                    on_skipped(paper)
+
+
+def open_deduplicator(config: dict) -> Optional[Deduplicator]:
+    """Build the deduplicator described by the ``dedup`` section of the config, or None if disabled."""
+    dedup_cfg = config.get('dedup', {})
+    if not dedup_cfg.get('enabled', True):
+        return None
+    return Deduplicator(
+        threshold=dedup_cfg.get('near_duplicate_threshold', 0.7),
+        num_perm=dedup_cfg.get('num_perm', 64),
+        bands=dedup_cfg.get('bands', 16),
+        shingle_size=dedup_cfg.get('shingle_size', 3),
+    )
@@ -0,0 +1,115 @@
+"""
+Interest Profiles: rank the same papers for several named keyword profiles from a single text scan.
+"""
+
+import re
+import logging
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+import metrics
+from content_analyzer import (AI_KEYWORDS, TRIGGER_WORDS, PaperFeatures, ScoredPaper, calculate_grade,
+                              score_paper)
+from keyword_matcher import KeywordMatcher
+from ranking_engine import RankingEngine, TopN, drop_ranked
+
+
+class InterestProfiles:
+    """Named keyword profiles, each with its own top N, evaluated together in one scan per paper.
+
+    One automaton holds the default keywords, the heuristics' trigger words
+    and every profile's keywords, and each keyword maps to the profiles that
+    list it with its weight there. ``observe`` scans every paper once and
+    pushes it into the top N of every profile it matches, scored like the
+    default keywords (title hits 3, abstract-only hits 1, repeats count
+    again); ``score_paper`` then reuses that scan for the default ranking.
+    Every profile's ranking uses the same ``RankingEngine``.
+    """
+
+    def __init__(self, profiles: Dict[str, dict], engine: Optional[RankingEngine] = None, top_n: int = 20,
+                 spare: bool = False):
+        self.names: List[str] = []
+        self.sizes: List[int] = []
+        self._tops: List[TopN] = []
+        self._postings: Dict[str, list] = {}
+        engine = engine or RankingEngine()
+        for index, (name, profile) in enumerate(profiles.items()):
+            if not re.fullmatch(r'[\w.-]+', name):
+                raise ValueError(f'Interest profile names are used as directory names: {name!r}')
+            keywords = [k.lower() for k in (profile or {}).get('keywords') or [] if k]
+            if not keywords:
+                raise ValueError(f'Interest profile {name!r} has no keywords')
+            size = (profile or {}).get('top_n', top_n)
+            self.names.append(name)
+            self.sizes.append(size)
+            # Spare places keep the list full when ranked() leaves papers out
+            self._tops.append(TopN(size * 2 if spare else size, key=engine.key))
+            for keyword, weight in Counter(keywords).items():
+                self._postings.setdefault(keyword, []).append((index, weight))
+        self.matched = [0] * len(self.names)
+        self.matcher = KeywordMatcher(AI_KEYWORDS, extra_terms=TRIGGER_WORDS + list(self._postings))
+        self._last = None
+
+    def observe(self, papers) -> Iterator:
+        """Scan each paper, rank it in every profile it matches, and pass it on unchanged."""
+        for paper in papers:
+            features = PaperFeatures(self.matcher.scan(paper.title, paper.summary), len(paper.authors))
+            self._last = (paper, features)
+            self._add(paper, features)
+            yield paper
+
+    def score_paper(self, paper) -> Optional[ScoredPaper]:
+        """``content_analyzer.score_paper``, reusing the scan ``observe`` made of ``paper``."""
+        last = self._last
+        return score_paper(paper, last[1] if last is not None and last[0] is paper else None)
+
+    def ranked(self, exclude=()) -> Dict[str, list]:
+        """Every profile's top N, best first, leaving out the papers whose id is in ``exclude``."""
+        for name, matched in zip(self.names, self.matched):
+            metrics.count(f'profile_{name}_relevant', matched)
+        return {name: drop_ranked(top.ranked(), exclude, size)
+                for name, size, top in zip(self.names, self.sizes, self._tops)}
+
+    def _add(self, paper, features: PaperFeatures) -> None:
+        hits = features.hits
+        scores: Dict[int, int] = {}
+        for term in hits.text:
+            for index, weight in self._postings.get(term, ()):
+                # Matches straddling the title and abstract make a paper relevant without adding to its score
+                if term in hits.title:
+                    weight *= 3
+                elif term not in hits.summary:
+                    weight = 0
+                scores[index] = scores.get(index, 0) + weight
+        if not scores:
+            return
+        grade = calculate_grade(features)
+        for index, score in scores.items():
+            self.matched[index] += 1
+            self._tops[index].push(ScoredPaper.from_paper(paper, score, grade, features=features))
+
+
+def open_profiles(config: dict, engine: Optional[RankingEngine] = None,
+                  spare: bool = False) -> Optional[InterestProfiles]:
+    """The profiles under ``interests``, or None when they are disabled or there are none.
+
+    ``spare`` doubles every profile's capacity for papers later excluded from ``ranked``.
+    """
+    interests_cfg = config.get('interests', {})
+    profiles = interests_cfg.get('profiles') or {}
+    if not interests_cfg.get('enabled', False) or not profiles:
+        return None
+    analysis_cfg = config.get('analysis', {})
+    if analysis_cfg.get('scorer', 'keyword') != 'keyword':
+        logging.warning('Interest profiles rank by keyword hits while the default ranking uses analysis.scorer %r; '
+                        'the same paper may rank differently in the two, and every paper is scanned twice',
+                        analysis_cfg.get('scorer'))
+    elif analysis_cfg.get('workers', 1) > 1:
+        logging.warning('With analysis.workers > 1 the worker processes scan every paper again; the profiles\' '
+                        'scan is only shared with serial keyword scoring')
+    ranking_cfg = config.get('ranking', {})
+    profiles = InterestProfiles(profiles, engine or RankingEngine.from_config(ranking_cfg),
+                                ranking_cfg.get('top_n', 20), spare)
+    logging.info('Ranking %d interest profiles alongside the default keywords: %s',
+                 len(profiles.names), ', '.join(profiles.names))
+    return profiles
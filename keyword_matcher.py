@@ -0,0 +1,93 @@
+"""
+Keyword Matcher: find every keyword occurrence in a paper's title and summary in a single scan.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import FrozenSet, Iterable, Tuple
+
+try:
+    import ahocorasick  # optional C automaton (pip install pyahocorasick)
+except ImportError:  # pragma: no cover - exercised when the extension is absent
+    ahocorasick = None
+
+
+@dataclass(frozen=True)
+class KeywordHits:
+    """Keywords and extra terms found in one paper, split by where they occur.
+
+    ``title`` and ``summary`` hold terms found inside the respective field;
+    ``text`` holds every term found in the joined ``"title summary"`` text,
+    which also includes the rare matches that straddle the join.
+    """
+    title: FrozenSet[str] = frozenset()
+    summary: FrozenSet[str] = frozenset()
+    text: FrozenSet[str] = frozenset()
+
+
+class KeywordMatcher:
+    """Compiled multi-keyword matcher built once from a keyword list.
+
+    Matching is case-insensitive substring matching, exactly like
+    ``keyword.lower() in text.lower()``. With ``pyahocorasick`` installed all
+    keywords are located in one pass of an Aho-Corasick automaton over each
+    field; without it each field is lowercased once and checked keyword by
+    keyword, which still gives the same hits.
+    """
+
+    def __init__(self, keywords: Iterable[str], extra_terms: Iterable[str] = ()):
+        lowered = [k.lower() for k in keywords if k]
+        # Multiplicity matters for scoring: a keyword listed twice scores twice.
+        self.weights = Counter(lowered)
+        self.keywords: Tuple[str, ...] = tuple(self.weights)
+        self._unit_weights = all(w == 1 for w in self.weights.values())
+        # Extra terms are located in the same scan but carry no score weight.
+        self.terms: Tuple[str, ...] = tuple(dict.fromkeys(
+            self.keywords + tuple(t.lower() for t in extra_terms if t)
+        ))
+        self._automaton = None
+        if ahocorasick is not None and self.terms:
+            self._automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        # Only terms containing a space can straddle the "title summary" join.
+        self._split_terms = tuple(
+            (term, term[:i], term[i + 1:])
+            for term in self.terms for i, ch in enumerate(term) if ch == ' '
+        )
+        self._split_heads = tuple(head for _, head, _ in self._split_terms)
+
+    def scan(self, title: str, summary: str) -> KeywordHits:
+        """Return every keyword hit in ``title`` and ``summary`` with its location."""
+        title_text = title.lower()
+        summary_text = summary.lower()
+        in_title = self._find(title_text)
+        in_summary = self._find(summary_text)
+        straddling = frozenset()
+        if title_text.endswith(self._split_heads):
+            straddling = frozenset(
+                term for term, head, tail in self._split_terms
+                if title_text.endswith(head) and summary_text.startswith(tail)
+            )
+        return KeywordHits(in_title, in_summary, in_title | in_summary | straddling)
+
+    def has_keyword(self, hits: KeywordHits) -> bool:
+        """True if any scored keyword (not just an extra term) occurs anywhere in the text."""
+        return not hits.text.isdisjoint(self.weights)
+
+    def score(self, hits: KeywordHits, title_weight: int = 3, summary_weight: int = 1) -> int:
+        """Score hits the way the per-keyword loop does: title hits win over summary hits."""
+        weights = self.weights
+        in_title = hits.title.intersection(weights)
+        summary_only = hits.summary.difference(hits.title).intersection(weights)
+        if self._unit_weights:
+            return title_weight * len(in_title) + summary_weight * len(summary_only)
+        return (title_weight * sum(weights[kw] for kw in in_title)
+                + summary_weight * sum(weights[kw] for kw in summary_only))
+
+    def _find(self, text: str) -> FrozenSet[str]:
+        if self._automaton is not None:
+            return frozenset(map(itemgetter(1), self._automaton.iter(text)))
+        return frozenset(term for term in self.terms if term in text)
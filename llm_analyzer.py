@@ -0,0 +1,280 @@
+"""
+LLM Analyzer: pluggable enrichment backends for the ranked papers, heuristic or an OpenAI-compatible model.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import datetime
+from typing import Dict, List, Optional
+
+# Bump when the prompt or the expected response shape changes; cached responses from another version are ignored
+PROMPT_VERSION = 1
+
+# Fields the backend writes; score and grade stay with the keyword scorer so the ranking is unaffected
+ENRICHED_FIELDS = ('description', 'relevance', 'use_cases', 'business_problems',
+                   'business_applications', 'justification')
+
+SYSTEM_PROMPT = """You analyze AI research papers for a business audience.
+The user message is JSON: {"papers": [{"id", "title", "abstract"}, ...]}.
+Reply with a JSON object {"analyses": [...]} holding one entry per paper, in any order, each with:
+  "id": the paper id, unchanged
+  "description": 2-3 sentence plain-language summary
+  "relevance": one sentence on why it matters for AI agents, prompting, LLMs or context engineering
+  "use_cases": exactly 3 short practical use cases
+  "business_problems": one sentence on the business problems it helps solve
+  "business_applications": one sentence on where a business could apply it
+  "justification": one sentence justifying the paper's importance"""
+
+# Rough characters per token, for budgeting requests before they are sent
+_CHARS_PER_TOKEN = 4
+
+
+class HeuristicBackend:
+    """The keyword-rule analysis; fields are already filled lazily on first access, so there is nothing to do."""
+
+    name = 'heuristic'
+
+    def enrich(self, papers) -> Dict[str, int]:
+        return {'heuristic': len(papers)}
+
+    def close(self) -> None:
+        pass
+
+
+class ResponseCache:
+    """On-disk LLM responses keyed by a hash of the prompt version, model, title and abstract."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, created_at TEXT NOT NULL)'
+        )
+
+    @staticmethod
+    def key(model: str, paper) -> str:
+        payload = json.dumps([PROMPT_VERSION, model, paper.title, paper.summary])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self._conn.execute('SELECT response FROM responses WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, model: str, response: dict) -> None:
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, model, json.dumps(response), datetime.datetime.now(datetime.timezone.utc).isoformat()),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class Budget:
+    """Per-run token and cost ceilings; a request is only sent if its worst case still fits.
+
+    Prices are per million tokens. Requests reserve their estimated prompt
+    size plus the full completion allowance and are settled with the usage the
+    endpoint reports, so concurrent requests can never overshoot the budget.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_cost: Optional[float] = None,
+                 input_price: float = 0.0, output_price: float = 0.0):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.input_price = input_price
+        self.output_price = output_price
+        self.tokens = 0
+        self.cost = 0.0
+        self._reserved_tokens = 0
+        self._reserved_cost = 0.0
+
+    def _cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.input_price + completion_tokens * self.output_price) / 1e6
+
+    def reserve(self, prompt_tokens: int, completion_tokens: int) -> bool:
+        tokens = prompt_tokens + completion_tokens
+        cost = self._cost(prompt_tokens, completion_tokens)
+        if self.max_tokens is not None and self.tokens + self._reserved_tokens + tokens > self.max_tokens:
+            return False
+        if self.max_cost is not None and self.cost + self._reserved_cost + cost > self.max_cost:
+            return False
+        self._reserved_tokens += tokens
+        self._reserved_cost += cost
+        return True
+
+    def settle(self, reserved: tuple, used: tuple) -> None:
+        """Replace a reservation of (prompt, completion) tokens with what was actually used."""
+        self._reserved_tokens -= sum(reserved)
+        self._reserved_cost -= self._cost(*reserved)
+        self.tokens += sum(used)
+        self.cost += self._cost(*used)
+
+
+class LLMBackend:
+    """Writes the enrichment fields with an OpenAI-compatible chat model.
+
+    Papers whose abstract was answered before come from the response cache;
+    the rest are sent ``batch_size`` per request with at most ``concurrency``
+    requests in flight. A paper keeps the heuristic analysis when its request
+    times out, fails, would exceed the token or cost budget, or comes back
+    without a usable answer for it, so a run always produces a full report.
+    """
+
+    name = 'llm'
+
+    def __init__(self, model: str, cache: Optional[ResponseCache] = None, base_url: Optional[str] = None,
+                 api_key: Optional[str] = None, batch_size: int = 5, concurrency: int = 4,
+                 timeout: float = 60, max_completion_tokens: int = 300, budget: Optional[Budget] = None):
+        self.model = model
+        self.cache = cache
+        self.base_url = base_url or None
+        self.api_key = api_key
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_completion_tokens = max_completion_tokens  # per paper in a batch
+        self.budget = budget or Budget()
+
+    def enrich(self, papers) -> Dict[str, int]:
+        """Fill the enrichment fields of ``papers`` in place; returns how many came from where."""
+        stats = {'cached': 0, 'llm': 0, 'timeout': 0, 'error': 0, 'over_budget': 0, 'invalid': 0}
+        pending = []
+        for paper in papers:
+            response = self.cache.get(ResponseCache.key(self.model, paper)) if self.cache else None
+            if response is not None and _apply(paper, response):
+                stats['cached'] += 1
+            else:
+                pending.append(paper)
+        if pending:
+            started = time.perf_counter()
+            asyncio.run(self._enrich(pending, stats))
+            logging.info('LLM analysis of %d papers took %.1fs (%d tokens, $%.4f)',
+                         len(pending), time.perf_counter() - started, self.budget.tokens, self.budget.cost)
+        return stats
+
+    async def _enrich(self, papers: List, stats: Dict[str, int]) -> None:
+        from openai import AsyncOpenAI  # only needed when the LLM backend is in use
+
+        client = AsyncOpenAI(api_key=self.api_key or 'unused', base_url=self.base_url,
+                             timeout=self.timeout, max_retries=1)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = [papers[i:i + self.batch_size] for i in range(0, len(papers), self.batch_size)]
+        try:
+            await asyncio.gather(*(self._run_batch(client, semaphore, batch, stats) for batch in batches))
+        finally:
+            await client.close()
+
+    async def _run_batch(self, client, semaphore: asyncio.Semaphore, batch: List, stats: Dict[str, int]) -> None:
+        import openai
+
+        by_id = {paper.arxiv_id: paper for paper in batch}
+        user_message = json.dumps({'papers': [
+            {'id': paper.arxiv_id, 'title': paper.title, 'abstract': paper.summary} for paper in batch
+        ]})
+        reserved = ((len(SYSTEM_PROMPT) + len(user_message)) // _CHARS_PER_TOKEN,
+                    self.max_completion_tokens * len(batch))
+        async with semaphore:
+            # Reserved once a slot is free, so queued batches do not hold budget ahead of the ones in flight
+            if not self.budget.reserve(*reserved):
+                stats['over_budget'] += len(batch)
+                return
+            used = (0, 0)
+            try:
+                response = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=self.model,
+                        messages=[{'role': 'system', 'content': SYSTEM_PROMPT},
+                                  {'role': 'user', 'content': user_message}],
+                        response_format={'type': 'json_object'},
+                        max_tokens=reserved[1],
+                        temperature=0,
+                    ),
+                    timeout=self.timeout,
+                )
+                used = (response.usage.prompt_tokens, response.usage.completion_tokens) \
+                    if response.usage is not None else reserved
+            except (asyncio.TimeoutError, openai.APITimeoutError):
+                logging.warning('LLM request for %d papers timed out; using heuristic analysis', len(batch))
+                stats['timeout'] += len(batch)
+                return
+            except openai.OpenAIError as exc:
+                logging.warning('LLM request for %d papers failed (%s); using heuristic analysis', len(batch), exc)
+                stats['error'] += len(batch)
+                return
+            finally:
+                self.budget.settle(reserved, used)
+
+        try:
+            analyses = json.loads(response.choices[0].message.content or '{}').get('analyses', [])
+        except (ValueError, AttributeError):
+            analyses = []
+        answered = set()
+        for analysis in analyses if isinstance(analyses, list) else []:
+            # A malformed id (a list, an object, a number) is invalid like any other malformed field
+            analysis_id = analysis.get('id') if isinstance(analysis, dict) else None
+            paper = by_id.get(analysis_id) if isinstance(analysis_id, str) else None
+            if paper is None or paper.arxiv_id in answered or not _apply(paper, analysis):
+                continue
+            answered.add(paper.arxiv_id)
+            if self.cache is not None:
+                self.cache.put(ResponseCache.key(self.model, paper), self.model, analysis)
+        stats['llm'] += len(answered)
+        stats['invalid'] += len(batch) - len(answered)
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.close()
+
+
+def _apply(paper, analysis: dict) -> bool:
+    """Copy a well-formed LLM answer onto the paper; False (and nothing changed) if it is malformed."""
+    use_cases = analysis.get('use_cases')
+    if not (isinstance(use_cases, list) and len(use_cases) >= 3
+            and all(isinstance(u, str) and u.strip() for u in use_cases[:3])):
+        return False
+    text_fields = [name for name in ENRICHED_FIELDS if name != 'use_cases']
+    if not all(isinstance(analysis.get(name), str) and analysis[name].strip() for name in text_fields):
+        return False
+    for name in text_fields:
+        setattr(paper, name, analysis[name].strip())
+    paper.use_cases = [u.strip() for u in use_cases[:3]]
+    return True
+
+
+def open_backend(config: dict):
+    """Build the enrichment backend named by ``analysis.backend`` in the config."""
+    analysis_cfg = config.get('analysis', {})
+    backend = analysis_cfg.get('backend', 'heuristic')
+    if backend == 'heuristic':
+        return HeuristicBackend()
+    if backend != 'llm':
+        raise ValueError(f'Unknown analysis backend: {backend}')
+    llm_cfg = analysis_cfg.get('llm', {})
+    cache_path = llm_cfg.get('cache_path', 'cache/llm_responses.db')
+    return LLMBackend(
+        model=llm_cfg.get('model', 'gpt-4o-mini'),
+        cache=ResponseCache(cache_path) if cache_path else None,
+        base_url=llm_cfg.get('base_url'),
+        api_key=os.getenv(llm_cfg.get('api_key_env', 'OPENAI_API_KEY')),
+        batch_size=llm_cfg.get('batch_size', 5),
+        concurrency=llm_cfg.get('concurrency', 4),
+        timeout=llm_cfg.get('timeout', 60),
+        max_completion_tokens=llm_cfg.get('max_completion_tokens', 300),
+        budget=Budget(
+            max_tokens=llm_cfg.get('max_tokens_per_run'),
+            max_cost=llm_cfg.get('max_cost_per_run'),
+            input_price=llm_cfg.get('input_price_per_mtok', 0.0),
+            output_price=llm_cfg.get('output_price_per_mtok', 0.0),
+        ),
+    )
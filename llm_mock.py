@@ -0,0 +1,194 @@
+"""
+LLM Mock: local OpenAI-compatible chat-completions endpoint for testing the LLM analysis backend.
+
+Answers the requests ``llm_analyzer.LLMBackend`` sends with deterministic
+canned analyses, with configurable latency, failures and hung requests, and
+counts the requests and tokens it served.
+
+Usage:
+    python llm_mock.py --port 8766 --latency 0.5 --timeout-rate 0.1
+    # then set analysis.backend: llm and analysis.llm.base_url: http://127.0.0.1:8766/v1
+"""
+
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class MockLLM:
+    """Threaded stand-in for ``POST /v1/chat/completions``.
+
+    Every request waits ``latency`` seconds. With probability ``error_rate``
+    it fails with HTTP 500, with probability ``timeout_rate`` it hangs for
+    ``hang_seconds`` before answering (longer than any sensible client
+    timeout), and with probability ``malformed_rate`` the reply is not JSON.
+    The random draws are seeded.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, malformed_rate: float = 0.0,
+                 hang_seconds: float = 30.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.malformed_rate = malformed_rate
+        self.hang_seconds = hang_seconds
+        self.stats = {'requests': 0, 'errors': 0, 'hung': 0, 'malformed': 0, 'papers': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0, 'max_in_flight': 0}
+        self._in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self) -> 'MockLLM':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='llm-mock', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'MockLLM':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def respond(self, request: dict):
+        """Return ``(status, body, delay)`` for a parsed chat-completions request."""
+        with self._lock:
+            self.stats['requests'] += 1
+            roll = self._rng.random()
+            malformed = self._rng.random() < self.malformed_rate
+        if roll < self.error_rate:
+            with self._lock:
+                self.stats['errors'] += 1
+            return 500, {'error': {'message': 'mock failure', 'type': 'server_error'}}, self.latency
+        delay = self.latency
+        if roll < self.error_rate + self.timeout_rate:
+            with self._lock:
+                self.stats['hung'] += 1
+            delay = self.hang_seconds
+
+        prompt = ''.join(m.get('content') or '' for m in request.get('messages', []))
+        try:
+            papers = json.loads(request['messages'][-1]['content']).get('papers', [])
+        except (KeyError, IndexError, ValueError, AttributeError):
+            papers = []
+        if malformed:
+            content = 'Sorry, I cannot produce JSON today.'
+        else:
+            content = json.dumps({'analyses': [_canned_analysis(p) for p in papers]})
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4}
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        with self._lock:
+            self.stats['malformed'] += malformed
+            self.stats['papers'] += len(papers)
+            self.stats['prompt_tokens'] += usage['prompt_tokens']
+            self.stats['completion_tokens'] += usage['completion_tokens']
+        body = {
+            'id': f"chatcmpl-mock-{self.stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'mock'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': usage,
+        }
+        return 200, body, delay
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.rstrip('/') != '/v1/chat/completions':
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    self.send_error(400)
+                    return
+                with mock._lock:
+                    mock._in_flight += 1
+                    mock.stats['max_in_flight'] = max(mock.stats['max_in_flight'], mock._in_flight)
+                try:
+                    status, body, delay = mock.respond(request)
+                    if delay > 0:
+                        time.sleep(delay)
+                    payload = json.dumps(body).encode('utf-8')
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up on a hung request
+                finally:
+                    with mock._lock:
+                        mock._in_flight -= 1
+
+            def log_message(self, fmt, *args):
+                logging.debug('llm mock: ' + fmt, *args)
+
+        return Handler
+
+
+def _canned_analysis(paper: dict) -> dict:
+    title = paper.get('title', 'this paper')
+    return {
+        'id': paper.get('id'),
+        'description': f'[mock] {title} studies a problem in modern AI systems.',
+        'relevance': f'[mock] Relevant to LLM practitioners through {title}.',
+        'use_cases': ['[mock] Use case one', '[mock] Use case two', '[mock] Use case three'],
+        'business_problems': '[mock] Reduces manual effort in knowledge work.',
+        'business_applications': '[mock] Internal assistants and analytics tooling.',
+        'justification': '[mock] A clear, practically useful contribution.',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local OpenAI-compatible endpoint for testing LLM analysis')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with HTTP 500')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests that hang')
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fraction of replies that are not JSON')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)-8s %(message)s')
+    mock = MockLLM(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                   timeout_rate=args.timeout_rate, malformed_rate=args.malformed_rate,
+                   hang_seconds=args.hang_seconds, seed=args.seed)
+    logging.info('Serving mock chat completions at %s/chat/completions', mock.url)
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -5,68 +5,598 @@ CLI entrypoint for the AI Paper Monitoring Agent.
 
 import os
 import sys
+import json
 import logging
 import argparse
+import datetime
+import contextlib
+import itertools
+from typing import Optional
 
-import yaml
-from dotenv import load_dotenv
+# Pipeline modules and third-party packages are imported inside the functions that use them,
+# so --help, --search and --test do not pay for the ArXiv client, numpy or the LLM backend.
 
-from arxiv_collector import fetch_recent_papers
-from content_analyzer import analyze_papers
-from ranking_engine import rank_analyses
-from report_generator import generate_report
+def run_pipeline(config: dict, test_mode: bool = False, force_refresh: bool = False,
+                 checkpoint=None, warm=None, progress: Optional[dict] = None) -> str:
+    """Execute the full analysis pipeline: fetch, analyze, rank, and generate report.
 
-def run_pipeline(config: dict, test_mode: bool = False) -> str:
-    """Execute the full analysis pipeline: fetch, analyze, rank, and generate report."""
+    With a ``checkpoint`` (a ``scheduler.RunCheckpoint``) progress is saved
+    after each stage, and a run that finds a checkpoint from a failed attempt
+    resumes after the last stage it completed. ``warm`` (a
+    ``service.WarmState``) supplies a paper cache and search index that stay
+    open after the run. ``progress``, if given, is kept up to date with the
+    current stage and the live counters. With ``test_mode`` this is ``run_dry_run``.
+
+    Stage timings, counters and peak memory are exported when the run ends,
+    as configured under ``metrics``; with ``profile.enabled`` each stage is
+    also profiled.
+    """
+    if test_mode:
+        return run_dry_run(config)
+    from metrics import run_metrics
+    from profiling import run_profiler
+
+    with run_metrics(config, kind='pipeline'), run_profiler(config, kind='pipeline'):
+        return _run_pipeline(config, force_refresh, checkpoint, warm, progress)
+
+def _run_pipeline(config: dict, force_refresh: bool, checkpoint, warm, progress: Optional[dict]) -> str:
+    from arxiv_collector import FetchState
+
+    if progress is None:
+        progress = {}
     arxiv_cfg = config.get('arxiv', {})
+    categories = arxiv_cfg.get('categories') or [arxiv_cfg.get('category', 'cs.AI')]
+
+    fetch_state = None
+    if arxiv_cfg.get('incremental', True):
+        fetch_state = FetchState(arxiv_cfg.get('state_path', 'cache/fetch_state.json'))
+    if checkpoint is not None and checkpoint.stage:
+        logging.info('Resuming run from checkpoint %s (started %s) after stage %s',
+                     checkpoint.path, checkpoint.started, checkpoint.stage)
+
+    if checkpoint is not None and checkpoint.reached('collected'):
+        ranked, counts, profiles = checkpoint.top, checkpoint.counts, checkpoint.profiles
+        if fetch_state is not None:
+            fetch_state.marks.update(checkpoint.marks)
+    else:
+        progress['stage'] = 'collecting'
+        with _stage('collect'):
+            ranked, counts, profiles = _collect(config, categories, fetch_state, force_refresh, warm, progress)
+        if checkpoint is not None:
+            checkpoint.complete('collected', ranked, counts,
+                                marks=fetch_state.marks if fetch_state is not None else {}, profiles=profiles)
+    logging.info('%d papers passed relevance filtering', counts['relevant'])
+    logging.info('Selected top %d papers', len(ranked))
+
+    if checkpoint is None or not checkpoint.reached('enriched'):
+        progress['stage'] = 'enriching'
+        with _stage('enrich'):
+            _enrich(config, [*ranked, *itertools.chain.from_iterable(profiles.values())])
+        if checkpoint is not None:
+            checkpoint.complete('enriched', ranked, profiles=profiles)
+
+    if checkpoint is not None and checkpoint.reached('reported'):
+        report_path = checkpoint.report_path
+    else:
+        progress['stage'] = 'reporting'
+        with _stage('report'):
+            report_path = _write_reports(config, ranked)
+            for name, profile_ranked in profiles.items():
+                logging.info('Report for interest profile %s generated at %s',
+                             name, _write_reports(config, profile_ranked, profile=name))
+        if checkpoint is not None:
+            checkpoint.complete('reported', report_path=report_path)
+    logging.info('Report generated at %s', report_path)
+
+    # Only persist the mark once a real run has succeeded, so a failed run is retried in full
+    if fetch_state is not None:
+        fetch_state.save()
+    if checkpoint is not None:
+        checkpoint.clear()
+    return report_path
+
+def run_dry_run(config: dict) -> str:
+    """Score, rank and report on papers already on disk, without the network or changing any state.
+
+    The papers are the newest ``arxiv.max_results`` in the paper cache or,
+    before the first real run, a deterministic synthetic sample. Nothing is
+    written to the cache, search index, fetch state or report index, and the
+    heuristic analysis is used whatever ``analysis.backend`` says.
+    """
+    from content_analyzer import iter_scored
+    from interest_profiles import open_profiles
+    from ranking_engine import RankingEngine, rank_analyses
+
+    arxiv_cfg = config.get('arxiv', {})
+    max_results = arxiv_cfg.get('max_results', 100)
+    papers, source = _dry_run_papers(config, max_results)
+    logging.info('Dry run on %d %s papers (no network access)', len(papers), source)
+    profiles = open_profiles(config)
+    if profiles is not None:
+        papers = profiles.observe(papers)
+        scored = (scored for scored in map(profiles.score_paper, papers) if scored is not None)
+    else:
+        scored = iter_scored(papers)
+    if config.get('analysis', {}).get('scorer', 'keyword') != 'keyword':
+        from bm25_scorer import iter_scored_batches, open_scorer
+
+        # The BM25 corpus statistics take in these papers but are not saved
+        scored = iter_scored_batches(papers, open_scorer(config))
+    ranked = rank_analyses(scored, config.get('ranking', {}).get('top_n', 20),
+                           RankingEngine.from_config(config.get('ranking', {})))
+    logging.info('Selected top %d papers', len(ranked))
+    report_path = _write_reports(config, ranked, dry_run=True)
+    logging.info('Report generated at %s', report_path)
+    if profiles is not None:
+        for name, profile_ranked in profiles.ranked().items():
+            logging.info('Report for interest profile %s generated at %s',
+                         name, _write_reports(config, profile_ranked, dry_run=True, profile=name))
+    print(report_path)
+    return report_path
+
+def _dry_run_papers(config: dict, limit: int):
+    cache_path = config.get('cache', {}).get('path', 'cache/papers.db')
+    if os.path.exists(cache_path):
+        from arxiv_metadata import paper_from_metadata
+        from paper_cache import recent_metadata
+
+        records = recent_metadata(cache_path, limit)
+        if records:
+            return [paper_from_metadata(record) for record in records], 'cached'
+    from synthetic_corpus import generate_papers
+    return generate_papers(limit), 'synthetic'
+
+
+def _collect(config: dict, categories: list, fetch_state, force_refresh: bool = False,
+             warm=None, progress: Optional[dict] = None):
+    """Fetch, deduplicate, score and rank; returns the top N, the fetched/relevant counts and the profiles' top N."""
+    from arxiv_collector import (ARXIV_REQUEST_INTERVAL, RetryPolicy, configure_collector, iter_category_papers,
+                                 open_page_journals)
+    from bm25_scorer import open_scorer
+    from dedup import NEAR_DUPLICATE, VERSION, open_deduplicator
+    from interest_profiles import open_profiles
+    from paper_cache import iter_scored_with_cache, open_cache
+    from ranking_engine import RankingEngine, drop_ranked, rank_analyses
+    from search_index import open_index
+
+    arxiv_cfg = config.get('arxiv', {})
+    analysis_cfg = config.get('analysis', {})
     ranking_cfg = config.get('ranking', {})
-    report_cfg = config.get('report', {})
 
-    category = arxiv_cfg.get('category', 'cs.AI')
     max_results = arxiv_cfg.get('max_results', 100)
     top_n = ranking_cfg.get('top_n', 20)
-    output_dir = report_cfg.get('output_dir', 'reports')
+    workers = analysis_cfg.get('workers', 1)
+    chunk_size = analysis_cfg.get('bm25', {}).get('chunk_size', 2000)
 
-    logging.info('Fetching recent papers for category %s (max %d)', category, max_results)
-    papers = fetch_recent_papers(category, max_results)
-    logging.info('Retrieved %d papers', len(papers))
+    configure_collector(arxiv_cfg.get('replay_url'),
+                        arxiv_cfg.get('request_interval', ARXIV_REQUEST_INTERVAL),
+                        RetryPolicy.from_config(arxiv_cfg))
+    journals = open_page_journals(config)
+    counts = {'fetched': 0, 'relevant': 0}
+    if progress is not None:
+        progress['counts'] = counts
+    since = {}
+    on_fetch = None
+    if fetch_state is not None:
+        if not force_refresh:
+            since = {cat: fetch_state.get(cat) for cat in categories if fetch_state.get(cat)}
+        # Advance the in-memory high-water marks as papers stream past; saved only on success
+        on_fetch = lambda category, paper: fetch_state.advance(category, (paper,))
+    failed = {}
+    on_error = None
+    if arxiv_cfg.get('salvage_partial', True):
+        def on_error(category, exc):
+            logging.warning('Giving up on category %s after %d retries (%s); continuing with the papers '
+                            'fetched so far', category, arxiv_cfg.get('retries', RetryPolicy.retries), exc)
+            failed[category] = exc
+    marks_before = dict(fetch_state.marks) if fetch_state is not None else {}
 
-    analyses = analyze_papers(papers)
-    logging.info('%d papers passed relevance filtering', len(analyses))
+    for category in categories:
+        if category in since:
+            logging.info('Fetching papers for category %s newer than %s (max %d)',
+                         category, since[category].published, max_results)
+        else:
+            logging.info('Fetching recent papers for category %s (max %d)', category, max_results)
+    papers = _counted(iter_category_papers(categories, max_results, since=since, on_fetch=on_fetch,
+                                           journals=journals, on_error=on_error),
+                      counts, 'fetched')
+    dedup = open_deduplicator(config)
+    engine = RankingEngine.from_config(ranking_cfg)
+    # With dedup, rankings keep spare places for the near-duplicates it supersedes after they were ranked
+    profiles = open_profiles(config, engine, spare=dedup is not None)
 
-    ranked = rank_analyses(analyses, top_n)
-    logging.info('Selected top %d papers', len(ranked))
+    # Papers stream from the collector through scoring into a bounded top-N,
+    # so each page is scored while the client waits out the rate limit. Only
+    # the ranked papers are enriched, lazily, when the report reads them.
+    cache = warm.cache if warm is not None else open_cache(config)
+    index = warm.index if warm is not None else open_index(config)
+    scorer = open_scorer(config)
+    try:
+        # Repeated versions and near-identical abstracts are dropped before they cost any analysis;
+        # the near-duplicates are still indexed for search, with no grade
+        if dedup is not None:
+            papers = dedup.filter(papers, on_skipped=index.add_skipped if index is not None else None)
+        # Interest profiles scan each paper once; the keyword scorer reuses that scan for papers not in the cache
+        if profiles is not None:
+            papers = profiles.observe(papers)
+        if scorer is not None:
+            logging.info('Scoring papers with BM25 in batches of %d', chunk_size)
+        elif workers > 1:
+            logging.info('Scoring papers across %d worker processes', workers)
+        scored = _counted(iter_scored_with_cache(papers, cache, force_refresh=force_refresh, workers=workers,
+                                                 on_scored=index.add if index is not None else None,
+                                                 scorer=scorer, chunk_size=chunk_size,
+                                                 score=profiles.score_paper if profiles is not None else None),
+                          counts, 'relevant')
+        ranked = rank_analyses(scored, top_n * 2 if dedup is not None else top_n, engine)
+        superseded = dedup.superseded if dedup is not None else ()
+        ranked = drop_ranked(ranked, superseded, top_n)
+        if scorer is not None:
+            scorer.save()
+        logging.info('Retrieved %d distinct papers from %d categories', counts['fetched'], len(categories))
+        if cache is not None:
+            session = cache.stats()['session']
+            logging.info('Cache: %d hits, %d new, %d revised, %d stale (hit rate %.0f%%)',
+                         session['hit'], session['miss'], session['revised'], session['stale'],
+                         100 * session['hit_rate'])
+    finally:
+        # A warm cache and index stay open for the next run; their writes are committed either way
+        for resource in (cache, index):
+            if resource is None:
+                continue
+            if warm is not None:
+                resource.flush()
+            else:
+                resource.close()
+    if dedup is not None:
+        logging.info('Dropped %d repeated versions and %d near-duplicate abstracts',
+                     dedup.counts[VERSION], dedup.counts[NEAR_DUPLICATE])
+    if failed and len(failed) == len(categories):
+        raise next(iter(failed.values()))
+    if failed:
+        logging.warning('Report covers only part of %s; the next run fetches them again from their previous '
+                        'high-water mark, resuming from the pages saved so far', ', '.join(failed))
+        # Papers past the failure were never seen, so the mark must not move beyond them
+        if fetch_state is not None:
+            for category in failed:
+                if category in marks_before:
+                    fetch_state.marks[category] = marks_before[category]
+                else:
+                    fetch_state.marks.pop(category, None)
+    # Every fetched page is scored and cached now; only failed categories keep their journals
+    if journals is not None:
+        journals.clear(keep=failed)
+    _count_collected(counts, cache, dedup)
+    return ranked, counts, profiles.ranked(superseded) if profiles is not None else {}
 
-    report_path = generate_report(ranked, output_dir)
-    logging.info('Report generated at %s', report_path)
-    if test_mode:
-        print(report_path)
+def run_backfill(config: dict, start: datetime.date, end: datetime.date,
+                 force_refresh: bool = False) -> str:
+    """Fetch, analyze and rank every paper submitted from start through end, window by window.
+
+    A checkpoint is saved after each window, so rerunning the same command
+    after a crash resumes at the first unfinished window. It is removed once
+    the report is written.
+    """
+    from metrics import run_metrics
+    from profiling import run_profiler
+
+    with run_metrics(config, kind='backfill'), run_profiler(config, kind='backfill'):
+        return _run_backfill(config, start, end, force_refresh)
+
+def _run_backfill(config: dict, start: datetime.date, end: datetime.date, force_refresh: bool) -> str:
+    from arxiv_collector import (ARXIV_REQUEST_INTERVAL, RetryPolicy, configure_collector, iter_category_papers,
+                                 open_page_journals)
+    from backfill import BackfillCheckpoint, date_windows
+    from bm25_scorer import open_scorer
+    from dedup import open_deduplicator
+    from paper_cache import iter_scored_with_cache, open_cache
+    from ranking_engine import RankingEngine, drop_ranked, rank_analyses
+    from search_index import open_index
+
+    arxiv_cfg = config.get('arxiv', {})
+    analysis_cfg = config.get('analysis', {})
+    ranking_cfg = config.get('ranking', {})
+    backfill_cfg = config.get('backfill', {})
+
+    categories = arxiv_cfg.get('categories') or [arxiv_cfg.get('category', 'cs.AI')]
+    window_days = backfill_cfg.get('window_days', 7)
+    max_results = backfill_cfg.get('max_results', 5000)
+    top_n = ranking_cfg.get('top_n', 20)
+    workers = analysis_cfg.get('workers', 1)
+    chunk_size = analysis_cfg.get('bm25', {}).get('chunk_size', 2000)
+    # Recency is judged from the end of the range, not from today
+    engine = RankingEngine.from_config(ranking_cfg, reference_date=end)
+
+    configure_collector(arxiv_cfg.get('replay_url'),
+                        arxiv_cfg.get('request_interval', ARXIV_REQUEST_INTERVAL),
+                        RetryPolicy.from_config(arxiv_cfg))
+    journals = open_page_journals(config)
+    windows = date_windows(start, end, window_days)
+    checkpoint = BackfillCheckpoint.for_range(backfill_cfg.get('checkpoint_dir', 'cache/backfill'),
+                                              start, end, categories, window_days)
+    if force_refresh:
+        checkpoint.reset()
+    elif checkpoint.completed:
+        logging.info('Resuming backfill from %s: %d of %d windows already done',
+                     checkpoint.path, len(checkpoint.completed), len(windows))
+
+    with _stage('collect'):
+        cache = open_cache(config)
+        index = open_index(config)
+        dedup = open_deduplicator(config)
+        scorer = open_scorer(config)
+        try:
+            for window in windows:
+                if checkpoint.is_done(window):
+                    continue
+                logging.info('Backfilling %s to %s', *window)
+                counts = dict(checkpoint.counts)
+                per_category = dict.fromkeys(categories, 0)
+                def on_fetch(category, paper):
+                    per_category[category] += 1
+                papers = _counted(iter_category_papers(categories, max_results, date_range=window,
+                                                       on_fetch=on_fetch, journals=journals),
+                                  counts, 'fetched')
+                if dedup is not None:
+                    papers = dedup.filter(papers,
+                                          on_skipped=index.add_skipped if index is not None else None)
+                scored = _counted(iter_scored_with_cache(papers, cache, force_refresh=force_refresh,
+                                                         workers=workers,
+                                                         on_scored=index.add if index is not None else None,
+                                                         scorer=scorer, chunk_size=chunk_size),
+                                  counts, 'relevant')
+                top = rank_analyses(itertools.chain(checkpoint.top, scored),
+                                    top_n * 2 if dedup is not None else top_n, engine)
+                top = drop_ranked(top, dedup.superseded if dedup is not None else (), top_n)
+                if scorer is not None:
+                    scorer.save()
+                if cache is not None:
+                    cache.flush()
+                if index is not None:
+                    index.flush()
+                checkpoint.complete(window, top, counts)
+                if journals is not None:
+                    journals.clear()
+                for category, fetched in per_category.items():
+                    if fetched >= max_results:
+                        logging.warning('%s returned backfill.max_results (%d) papers for %s to %s, so the rest '
+                                        'of that window was skipped; lower backfill.window_days or raise '
+                                        'backfill.max_results', category, max_results, *window)
+                logging.info('Window done: %d papers fetched, %d relevant so far',
+                             counts['fetched'], counts['relevant'])
+            if index is not None:
+                index.optimize()
+        finally:
+            if cache is not None:
+                cache.close()
+            if index is not None:
+                index.close()
+        _count_collected(checkpoint.counts, cache, dedup)
+
+    with _stage('enrich'):
+        _enrich(config, checkpoint.top)
+    with _stage('report'):
+        report_path = _write_reports(config, checkpoint.top)
+    logging.info('Backfill of %s to %s complete: %d papers, %d relevant; report at %s',
+                 start, end, checkpoint.counts['fetched'], checkpoint.counts['relevant'], report_path)
+    # Done: rerunning the range (e.g. up to today, later on) must fetch again, not replay this result
+    checkpoint.reset()
     return report_path
 
+def search_papers(config: dict, query: str, limit: int = 20, since=None, until=None,
+                  min_grade=None) -> list:
+    """Answer a ranked full-text query from the local search index; never touches the network."""
+    from search_index import open_index
+
+    index = open_index(dict(config, search=dict(config.get('search', {}), enabled=True)))
+    try:
+        return index.search(query, limit=limit, since=since, until=until, min_grade=min_grade)
+    finally:
+        index.close()
+
+def _enrich(config: dict, ranked) -> None:
+    """Write the full analysis of the ranked papers with the configured backend (heuristic or LLM).
+
+    A paper ranked in several lists (the default top N and interest
+    profiles) is a separate object in each; it is enriched once and the
+    result copied to the others, so every report reads the same.
+    """
+    from llm_analyzer import ENRICHED_FIELDS, open_backend
+
+    unique, copies = {}, []
+    for paper in ranked:
+        if paper.arxiv_id in unique:
+            copies.append(paper)
+        else:
+            unique[paper.arxiv_id] = paper
+    backend = open_backend(config)
+    try:
+        stats = backend.enrich(list(unique.values()))
+    finally:
+        backend.close()
+    for paper in copies:
+        # Only fields the backend wrote; the heuristic ones stay lazy
+        enriched = unique[paper.arxiv_id].__dict__
+        paper.__dict__.update({name: enriched[name] for name in ENRICHED_FIELDS if name in enriched})
+    if backend.name != 'heuristic':
+        logging.info('Enrichment (%s): %s', backend.name,
+                     ', '.join(f'{count} {source}' for source, count in stats.items() if count))
+    import metrics
+    for source, count in stats.items():
+        metrics.count(f'enriched_{source}', count)
+
+def _write_reports(config: dict, ranked, dry_run: bool = False, profile: Optional[str] = None) -> str:
+    """Write the configured report formats (and delta reports) and return the main report's path.
+
+    A dry run neither writes delta reports nor records its papers as reported.
+    An interest ``profile``'s reports go to a subdirectory of its own and
+    have a report index of their own for the delta.
+    """
+    from report_generator import write_reports
+
+    report_cfg = config.get('report', {})
+    formats = report_cfg.get('formats') or ['md']
+    output_dir = report_cfg.get('output_dir', 'reports')
+    index_path = report_cfg.get('index_path', 'cache/report_index.db')
+    title = 'AI Papers Analysis'
+    if profile is not None:
+        output_dir = os.path.join(output_dir, profile)
+        root, ext = os.path.splitext(index_path)
+        index_path = f'{root}_{profile}{ext}'
+        title = f'AI Papers Analysis ({profile})'
+    paths = write_reports(
+        ranked,
+        output_dir,
+        formats=formats,
+        delta=report_cfg.get('delta', False) and not dry_run,
+        index_path=None if dry_run else index_path,
+        title=title,
+    )
+    for name, path in paths.items():
+        if name != formats[0]:
+            logging.info('Also wrote %s report %s', name, path)
+    return paths[formats[0]]
+
+@contextlib.contextmanager
+def _stage(name: str):
+    """Time one stage of a run and, when profiling is on, profile it."""
+    import metrics
+    import profiling
+
+    with metrics.stage(name), profiling.stage(name):
+        yield
+
+@contextlib.contextmanager
+def _exclusive_run(config: dict):
+    """Hold the pipeline lock for a manual run or backfill; exits if another run holds it."""
+    from scheduler import RunLock
+
+    lock_path = config.get('schedule', {}).get('lock_path', 'cache/pipeline.lock')
+    with RunLock(lock_path) as lock:
+        if not lock.acquired:
+            logging.error('Another run holds %s (pid %s); not starting', lock_path, lock.holder() or 'unknown')
+            sys.exit(1)
+        yield
+
+def _count_collected(counts: dict, cache, dedup) -> None:
+    """Add the collection totals, cache outcomes and dropped duplicates to the run's metrics."""
+    import metrics
+    from dedup import NEAR_DUPLICATE, VERSION
+    from paper_cache import HIT, MISS, REVISED, STALE
+
+    metrics.count('papers_relevant', counts['relevant'])
+    if cache is not None:
+        for outcome in (HIT, MISS, REVISED, STALE):
+            metrics.count(f'cache_{outcome}', cache.session[outcome])
+    if dedup is not None:
+        metrics.count('dedup_repeated_versions', dedup.counts[VERSION])
+        metrics.count('dedup_near_duplicates', dedup.counts[NEAR_DUPLICATE])
+
+def _counted(items, counts: dict, name: str):
+    for item in items:
+        counts[name] += 1
+        yield item
+
+def load_config(path: str, replay: Optional[str] = None, workers: Optional[int] = None,
+                profile: bool = False) -> dict:
+    """Read the YAML configuration and apply the command-line overrides."""
+    import yaml
+
+    with open(path, 'r') as f:
+        config = yaml.safe_load(f)
+    if replay:
+        config.setdefault('arxiv', {})['replay_url'] = replay
+    if workers is not None:
+        config.setdefault('analysis', {})['workers'] = workers
+    if profile:
+        config['profile'] = dict(config.get('profile') or {}, enabled=True)
+    return config
+
 def main():
     parser = argparse.ArgumentParser(description='AI Paper Monitoring Agent')
     parser.add_argument('--run', action='store_true', help='Run full analysis')
-    parser.add_argument('--test', action='store_true', help='Dry run for testing')
+    parser.add_argument('--test', action='store_true',
+                        help='Dry run on cached (or synthetic) papers: no network, no cache or state changes')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Run the pipeline every schedule.interval_hours until stopped (see schedule in config.yaml)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Like --daemon, but keep state warm between runs and accept run/status/reload '
+                             'requests on service.port (see service in config.yaml)')
+    parser.add_argument('--force-refresh', action='store_true',
+                        help='Fetch the full max_results and re-analyze every paper, ignoring cache and high-water marks')
+    parser.add_argument('--replay', metavar='URL',
+                        help='Fetch from a local ArXiv stand-in (python arxiv_standin.py) instead of the live API')
+    parser.add_argument('--from-date', type=datetime.date.fromisoformat, metavar='YYYY-MM-DD',
+                        help='Backfill papers submitted from this date (resumable; see backfill in config.yaml)')
+    parser.add_argument('--to-date', type=datetime.date.fromisoformat, metavar='YYYY-MM-DD',
+                        help='Last submission date to backfill (default: today)')
+    parser.add_argument('--search', metavar='QUERY',
+                        help='Search every collected paper in the local index (FTS5 syntax; '
+                             '--from-date/--to-date limit the submission dates)')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum --search results')
+    parser.add_argument('--min-grade', type=int, help='Only --search results graded at least this')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='Score papers across N processes (overrides analysis.workers in config.yaml)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile each stage of the run (also --daemon, --serve and backfills) with cProfile '
+                             'and tracemalloc; see profile in config.yaml')
+    parser.add_argument('--cache-stats', action='store_true', help='Print processed-paper cache statistics')
+    parser.add_argument('--invalidate-cache', nargs='?', const='stale', choices=['stale', 'all'],
+                        help='Drop cache entries from older keyword/scoring logic (or all entries)')
     args = parser.parse_args()
 
     # Load environment variables
+    from dotenv import load_dotenv
     load_dotenv()
-    # Load YAML configuration
     cfg_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
-    with open(cfg_path, 'r') as f:
-        config = yaml.safe_load(f)
+    config = load_config(cfg_path, replay=args.replay, workers=args.workers, profile=args.profile)
 
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s %(levelname)-8s %(message)s'
     )
+    # The LLM backend's HTTP client logs every request at INFO
+    logging.getLogger('httpx').setLevel(logging.WARNING)
 
-    if args.test:
+    if args.cache_stats or args.invalidate_cache:
+        from paper_cache import open_cache
+        cache = open_cache(dict(config, cache=dict(config.get('cache', {}), enabled=True)))
+        try:
+            if args.invalidate_cache:
+                removed = cache.invalidate(everything=args.invalidate_cache == 'all')
+                logging.info('Removed %d cache entries', removed)
+            if args.cache_stats:
+                print(json.dumps(cache.stats(), indent=2))
+        finally:
+            cache.close()
+    elif args.search:
+        results = search_papers(config, args.search, limit=args.limit, since=args.from_date,
+                                until=args.to_date, min_grade=args.min_grade)
+        for r in results:
+            grade = f"{r['grade']}/10" if r['grade'] is not None else '  - '
+            print(f"{r['published']}  {grade:>5}  {r['arxiv_id']:<12} {r['title']}")
+        if not results:
+            print('No matching papers')
+    elif args.from_date:
+        to_date = args.to_date or datetime.datetime.now(datetime.timezone.utc).date()
+        # The backfill writes the same cache, index and report index as a run
+        with _exclusive_run(config):
+            logging.info('Starting backfill from %s to %s', args.from_date, to_date)
+            run_backfill(config, args.from_date, to_date, force_refresh=args.force_refresh)
+    elif args.test:
         logging.info('Running in test (dry-run) mode')
-        run_pipeline(config, test_mode=True)
-    elif args.run:
-        logging.info('Starting full analysis run')
-        run_pipeline(config)
+        run_dry_run(config)
+    elif args.serve:
+        from service import Service
+        Service(lambda: load_config(cfg_path, replay=args.replay, workers=args.workers,
+                                    profile=args.profile)).serve_forever()
+    elif args.daemon:
+        from scheduler import run_scheduler  # the scheduler imports this module for its workers
+        run_scheduler(config.get('schedule', {}).get('interval_hours', 48), config)
+    elif args.run or args.force_refresh:
+        with _exclusive_run(config):
+            logging.info('Starting full analysis run')
+            run_pipeline(config, force_refresh=args.force_refresh)
     else:
         parser.print_help()
         sys.exit(1)
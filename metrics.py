@@ -0,0 +1,296 @@
+"""
+Metrics: per-run stage timers, counters and peak memory, exported as a JSON summary and a Prometheus textfile.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import datetime
+import threading
+import contextlib
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # not on Windows; peak memory then comes from the sampler alone
+    resource = None
+
+# The run being measured, if any. The module-level helpers below do nothing
+# without one, so instrumented code costs a function call when metrics are off.
+_current: Optional['RunMetrics'] = None
+
+_PREFIX = 'arxiv_agent'
+
+
+class RunMetrics:
+    """Timings, counters and memory of one run.
+
+    Stages are the run's top-level phases, timed end to end. Components are
+    time spent inside them (API paging, rate-limit sleeps, scoring, ranking,
+    report writing), added up across threads, so concurrent fetch workers can
+    make a component exceed its stage's wall time. A background thread samples
+    the resident set size every ``sample_seconds`` and rewrites the Prometheus
+    textfile every ``textfile_seconds``, so a run that overruns is visible
+    while it is still going.
+    """
+
+    def __init__(self, kind: str = 'pipeline', budget_seconds: float = 600, sample_seconds: float = 0.5,
+                 textfile_path: Optional[str] = None, textfile_seconds: float = 15):
+        self.kind = kind
+        self.budget_seconds = budget_seconds
+        self.sample_seconds = sample_seconds
+        self.textfile_path = textfile_path
+        self.textfile_seconds = textfile_seconds
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.finished: Optional[datetime.datetime] = None
+        self.success: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.stages: Dict[str, dict] = {}
+        self.timers: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.rss_peak = _rss()
+        self._stage: Optional[str] = None
+        self._t0 = time.perf_counter()
+        self._duration = 0.0
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._done = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def start(self) -> None:
+        self.export_textfile()
+        if self.sample_seconds > 0:
+            self._sampler = threading.Thread(target=self._sample_loop, name='metrics-sampler', daemon=True)
+            self._sampler.start()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage ``name``, with its peak memory."""
+        with self._lock:
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'rss_peak_bytes': 0})
+        self._stage = name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['seconds'] += time.perf_counter() - started
+            self.sample()
+            self._stage = None
+            self.export_textfile()
+
+    def sample(self) -> None:
+        rss = _rss()
+        self.rss_peak = max(self.rss_peak, rss)
+        stage = self.stages.get(self._stage) if self._stage else None
+        if stage is not None:
+            stage['rss_peak_bytes'] = max(stage['rss_peak_bytes'], rss)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self._done.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.sample()
+        self.finished = datetime.datetime.now(datetime.timezone.utc)
+        self.success = error is None
+        self.error = f'{type(error).__name__}: {error}' if error is not None else None
+        self._duration = self.elapsed
+
+    def summary(self) -> dict:
+        with self._lock:
+            timers = {name: round(seconds, 3) for name, seconds in sorted(self.timers.items())}
+            counters = dict(sorted(self.counters.items()))
+            stages = {name: {'seconds': round(stage['seconds'], 3), 'rss_peak_bytes': stage['rss_peak_bytes']}
+                      for name, stage in self.stages.items()}
+        return {
+            'kind': self.kind,
+            'started': self.started.isoformat(),
+            'finished': self.finished.isoformat() if self.finished else None,
+            'duration_seconds': round(self._duration if self.finished else self.elapsed, 3),
+            'budget_seconds': self.budget_seconds,
+            'success': self.success,
+            'error': self.error,
+            'stages': stages,
+            'components': timers,
+            'counters': counters,
+            'rss_peak_bytes': self.rss_peak,
+            'process_max_rss_bytes': _max_rss(),
+        }
+
+    def prometheus(self) -> str:
+        """The summary in the Prometheus text exposition format, for node exporter's textfile collector."""
+        s = self.summary()
+        kind = f'kind="{self.kind}"'
+        in_progress = self.finished is None
+        lines = []
+
+        def gauge(name: str, help_text: str, samples) -> None:
+            lines.append(f'# HELP {_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {_PREFIX}_{name} gauge')
+            for labels, value in samples:
+                lines.append(f'{_PREFIX}_{name}{{{",".join([kind, *labels])}}} {value}')
+
+        gauge('run_in_progress', '1 while a run is going, 0 once it has finished.', [((), int(in_progress))])
+        gauge('run_start_timestamp_seconds', 'Unix time the current or last run started.',
+              [((), round(self.started.timestamp(), 3))])
+        gauge('run_duration_seconds', 'Wall time of the last run, or of the current run so far.',
+              [((), s['duration_seconds'])])
+        gauge('run_budget_seconds', 'Time a run is expected to finish within.', [((), self.budget_seconds)])
+        if not in_progress:
+            gauge('run_success', '1 if the last run succeeded, 0 if it failed.', [((), int(self.success))])
+        gauge('stage_duration_seconds', 'Wall time of each stage of the run.',
+              [((f'stage="{name}"',), stage['seconds']) for name, stage in s['stages'].items()])
+        gauge('component_seconds', 'Time spent in each component, summed across threads.',
+              [((f'component="{name}"',), seconds) for name, seconds in s['components'].items()])
+        gauge('run_events', 'Events counted during the run: pages, papers, cache hits, retries.',
+              [((f'event="{name}"',), n) for name, n in s['counters'].items()])
+        gauge('rss_peak_bytes', 'Peak resident set size sampled during the run.', [((), s['rss_peak_bytes'])])
+        gauge('stage_rss_peak_bytes', 'Peak resident set size sampled during each stage.',
+              [((f'stage="{name}"',), stage['rss_peak_bytes']) for name, stage in s['stages'].items()])
+        return '\n'.join(lines) + '\n'
+
+    def export_textfile(self) -> None:
+        if not self.textfile_path:
+            return
+        # Losing a metrics update must never fail the run being measured
+        try:
+            with self._export_lock:
+                _write_atomic(self.textfile_path, self.prometheus())
+        except OSError as exc:
+            logging.warning('Could not update metrics textfile %s: %s', self.textfile_path, exc)
+
+    def write_summary(self, directory: str) -> str:
+        path = os.path.join(directory, f'{self.kind}_{self.started.astimezone():%Y-%m-%d_%H%M%S}.json')
+        _write_atomic(path, json.dumps(self.summary(), indent=2) + '\n')
+        return path
+
+    def _sample_loop(self) -> None:
+        next_export = time.monotonic() + self.textfile_seconds
+        while not self._done.wait(self.sample_seconds):
+            self.sample()
+            if time.monotonic() >= next_export:
+                next_export += self.textfile_seconds
+                self.export_textfile()
+
+
+@contextlib.contextmanager
+def run_metrics(config: dict, kind: str = 'pipeline'):
+    """Measure the enclosed run and export its metrics when it ends, whether or not it succeeded.
+
+    Yields the ``RunMetrics``, or None when ``metrics.enabled`` is false or a
+    run is already being measured in this process.
+    """
+    global _current
+    metrics_cfg = config.get('metrics', {})
+    if not metrics_cfg.get('enabled', True) or _current is not None:
+        yield None
+        return
+    run = RunMetrics(
+        kind=kind,
+        budget_seconds=metrics_cfg.get('budget_seconds', 600),
+        sample_seconds=metrics_cfg.get('sample_seconds', 0.5),
+        textfile_path=metrics_cfg.get('textfile_path', 'cache/metrics/arxiv_agent.prom'),
+        textfile_seconds=metrics_cfg.get('textfile_seconds', 15),
+    )
+    _current = run
+    run.start()
+    error = None
+    try:
+        yield run
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        _current = None
+        run.finish(error)
+        _export(run, metrics_cfg.get('summary_dir', 'cache/metrics'))
+
+
+def _export(run: RunMetrics, summary_dir: Optional[str]) -> None:
+    summary = run.summary()
+    stages = ', '.join(f'{name} {stage["seconds"]:.1f}s' for name, stage in summary['stages'].items())
+    logging.info('Run took %.1fs of its %ss budget (%s); peak memory %.0f MB',
+                 summary['duration_seconds'], run.budget_seconds, stages or 'no stages',
+                 summary['rss_peak_bytes'] / 2 ** 20)
+    if summary['duration_seconds'] > run.budget_seconds:
+        logging.warning('Run exceeded its %ss budget', run.budget_seconds)
+    run.export_textfile()
+    if summary_dir:
+        try:
+            logging.info('Run metrics written to %s', run.write_summary(summary_dir))
+        except OSError as exc:
+            logging.warning('Could not write the run metrics summary: %s', exc)
+
+
+def active() -> Optional[RunMetrics]:
+    return _current
+
+
+def count(name: str, n: int = 1) -> None:
+    run = _current
+    if run is not None:
+        run.count(name, n)
+
+
+def add_time(name: str, seconds: float) -> None:
+    run = _current
+    if run is not None:
+        run.add_time(name, seconds)
+
+
+@contextlib.contextmanager
+def timed(name: str):
+    """Add the time spent in the enclosed block to component ``name``."""
+    run = _current
+    if run is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_time(name, time.perf_counter() - started)
+
+
+def stage(name: str):
+    run = _current
+    return run.stage(name) if run is not None else contextlib.nullcontext()
+
+
+def _rss() -> int:
+    """Current resident set size in bytes, or the process' peak where that is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return _max_rss()
+
+
+def _max_rss() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def _write_atomic(path: str, text: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,292 @@
+"""
+Paper Cache: persistent SQLite store of processed papers so scheduled runs skip work already done.
+"""
+
+import json
+import os
+import sqlite3
+import datetime
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from arxiv_metadata import paper_metadata, parse_arxiv_id
+from content_analyzer import PaperAnalysis, ScoredPaper, analysis_fingerprint, score_paper
+from parallel_analyzer import iter_scored_parallel
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id     TEXT    NOT NULL,  -- base id without the version suffix
+    version      INTEGER NOT NULL,
+    fingerprint  TEXT    NOT NULL,  -- analysis_fingerprint() at processing time
+    metadata     TEXT    NOT NULL,  -- raw ArXiv metadata as JSON
+    analysis     TEXT,              -- ScoredPaper ranking fields as JSON, NULL if filtered out
+    processed_at TEXT    NOT NULL,
+    published    TEXT,              -- metadata's published timestamp, indexed for recent_metadata
+    PRIMARY KEY (arxiv_id, version)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Lookup outcomes, also the names of the persisted counters
+HIT, MISS, REVISED, STALE = 'hit', 'miss', 'revised', 'stale'
+
+
+class PaperCache:
+    """Processed papers keyed by ArXiv id and version, tagged with the analysis fingerprint.
+
+    A lookup is a hit only when the same version of the paper was processed
+    under the current fingerprint; a newer version is reported as ``revised``
+    and an entry from an older keyword list or scoring logic as ``stale``.
+    """
+
+    COMMIT_EVERY = 500
+
+    def __init__(self, path: str, fingerprint: str, memory_entries: int = 0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.fingerprint = fingerprint
+        self.session = {HIT: 0, MISS: 0, REVISED: 0, STALE: 0}
+        self._unsaved = dict(self.session)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+        _add_published_column(self._conn)
+        self._pending = 0
+        # Latest (version, fingerprint, analysis) per id, least recently used first; a long-running
+        # process answers repeat lookups from here instead of SQLite
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict = OrderedDict()
+
+    def lookup(self, paper) -> Tuple[str, Optional[ScoredPaper]]:
+        """Return the lookup outcome and, on a hit, the cached scoring (None if it was filtered out)."""
+        arxiv_id, version = parse_arxiv_id(paper.entry_id)
+        row = self._memory.get(arxiv_id)
+        if row is not None:
+            self._memory.move_to_end(arxiv_id)
+        else:
+            row = self._conn.execute(
+                'SELECT version, fingerprint, analysis FROM papers '
+                'WHERE arxiv_id = ? ORDER BY version DESC LIMIT 1',
+                (arxiv_id,),
+            ).fetchone()
+            if row is not None:
+                self._remember(arxiv_id, row)
+        if row is None:
+            outcome = MISS
+        elif row[0] < version:
+            outcome = REVISED
+        elif row[1] != self.fingerprint:
+            outcome = STALE
+        else:
+            outcome = HIT
+        self.session[outcome] += 1
+        self._unsaved[outcome] += 1
+        if outcome != HIT:
+            return outcome, None
+        return outcome, _load_scored(row[2], paper)
+
+    def store(self, paper, scored: Optional[ScoredPaper]) -> None:
+        """Record that ``paper`` was processed, with its scoring or None if it was not relevant.
+
+        Only the ranking fields are stored: the write-up is rebuilt lazily
+        from the paper text for the few cached papers that reach a report.
+        """
+        arxiv_id, version = parse_arxiv_id(paper.entry_id)
+        analysis = json.dumps(scored.scored_fields()) if scored is not None else None
+        metadata = paper_metadata(paper)
+        self._conn.execute(
+            'INSERT OR REPLACE INTO papers '
+            '(arxiv_id, version, fingerprint, metadata, analysis, processed_at, published) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                arxiv_id,
+                version,
+                self.fingerprint,
+                json.dumps(metadata),
+                analysis,
+                datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                metadata['published'],
+            ),
+        )
+        known = self._memory.get(arxiv_id)
+        if known is None or known[0] <= version:
+            self._remember(arxiv_id, (version, self.fingerprint, analysis))
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.flush()
+
+    def _remember(self, arxiv_id: str, row: tuple) -> None:
+        if not self.memory_entries:
+            return
+        self._memory[arxiv_id] = row
+        self._memory.move_to_end(arxiv_id)
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def flush(self) -> None:
+        """Commit pending writes and fold this session's lookup counts into the lifetime totals."""
+        with self._conn:
+            for name, value in self._unsaved.items():
+                self._conn.execute(
+                    'INSERT INTO counters VALUES (?, ?) '
+                    'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+                    (name, value),
+                )
+        self._unsaved = {name: 0 for name in self._unsaved}
+        self._pending = 0
+
+    def reset_session(self) -> None:
+        """Start counting a new session, e.g. the next run of a long-running process."""
+        self.flush()
+        self.session = {name: 0 for name in self.session}
+
+    def stats(self) -> dict:
+        """Entry counts and hit rates for this session and over the cache's lifetime."""
+        lifetime = dict(self._conn.execute('SELECT name, value FROM counters'))
+        for name, value in self._unsaved.items():
+            lifetime[name] = lifetime.get(name, 0) + value
+        total, current = self._conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(fingerprint = ?), 0) FROM papers', (self.fingerprint,)
+        ).fetchone()
+        return {
+            'path': self.path,
+            'fingerprint': self.fingerprint,
+            'entries': total,
+            'current_entries': current,
+            'stale_entries': total - current,
+            'session': dict(self.session, hit_rate=_hit_rate(self.session)),
+            'lifetime': dict(lifetime, hit_rate=_hit_rate(lifetime)),
+        }
+
+    def invalidate(self, everything: bool = False) -> int:
+        """Delete stale entries (or every entry) and return how many were removed."""
+        with self._conn:
+            if everything:
+                cursor = self._conn.execute('DELETE FROM papers')
+            else:
+                cursor = self._conn.execute(
+                    'DELETE FROM papers WHERE fingerprint != ?', (self.fingerprint,)
+                )
+        self._memory.clear()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+def open_cache(config: dict, memory_entries: int = 0) -> Optional[PaperCache]:
+    """Open the cache described by the ``cache`` section of the config, or None if disabled."""
+    cache_cfg = config.get('cache', {})
+    if not cache_cfg.get('enabled', True):
+        return None
+    scorer = None
+    if config.get('analysis', {}).get('scorer', 'keyword') != 'keyword':
+        from bm25_scorer import scorer_signature
+
+        scorer = scorer_signature(config)
+    return PaperCache(cache_cfg.get('path', 'cache/papers.db'), analysis_fingerprint(scorer), memory_entries)
+
+
+def recent_metadata(path: str, limit: int) -> List[dict]:
+    """Metadata of the ``limit`` most recently published papers in the cache at ``path``, read-only."""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        # Walks the published index from the newest entry; a cache not yet opened for writing since the
+        # column was added has to be sorted by the JSON field instead
+        published = 'published' if _has_published_column(conn) else "json_extract(metadata, '$.published')"
+        rows = conn.execute(f'SELECT metadata FROM papers ORDER BY {published} DESC, version DESC')
+        records, seen = [], set()
+        for (metadata,) in rows:
+            record = json.loads(metadata)
+            arxiv_id = parse_arxiv_id(record['entry_id'])[0]
+            if arxiv_id not in seen:
+                seen.add(arxiv_id)
+                records.append(record)
+                if len(records) >= limit:
+                    break
+        return records
+    finally:
+        conn.close()
+
+
+def _has_published_column(conn: sqlite3.Connection) -> bool:
+    return any(row[1] == 'published' for row in conn.execute('PRAGMA table_info(papers)'))
+
+
+def _add_published_column(conn: sqlite3.Connection) -> None:
+    # Caches created before the column existed get it filled in once from the stored metadata
+    if not _has_published_column(conn):
+        with conn:
+            conn.execute('ALTER TABLE papers ADD COLUMN published TEXT')
+            conn.execute("UPDATE papers SET published = json_extract(metadata, '$.published')")
+    conn.execute('CREATE INDEX IF NOT EXISTS papers_published ON papers (published, version)')
+    conn.commit()
+
+
+def iter_scored_with_cache(papers, cache: Optional[PaperCache], force_refresh: bool = False,
+                           workers: int = 1,
+                           on_scored: Optional[Callable] = None,
+                           scorer=None, chunk_size: int = 2000,
+                           score: Optional[Callable] = None) -> Iterator[ScoredPaper]:
+    """Like ``iter_scored``, but only scores papers the cache has not seen at this version and fingerprint.
+
+    With ``workers`` > 1 the scoring is spread over a process pool; the
+    output, including its order, is the same. ``on_scored(paper, scored)``
+    is called for every paper, cached or not, with None for papers that are
+    not relevant, e.g. to feed the search index. A batch ``scorer`` from
+    ``bm25_scorer.open_scorer`` replaces ``score_paper`` and scores
+    ``chunk_size`` uncached papers at a time; ``workers`` is then ignored.
+    ``score`` replaces ``score_paper`` on the serial path.
+    """
+    def lookup(paper):
+        if cache is None or force_refresh:
+            return False, None
+        outcome, scored = cache.lookup(paper)
+        return outcome == HIT, scored
+
+    if scorer is not None:
+        from bm25_scorer import iter_scored_batches
+
+        yield from iter_scored_batches(papers, scorer, chunk_size, lookup=lookup,
+                                       store=cache.store if cache is not None else None,
+                                       on_scored=on_scored)
+        return
+    if workers > 1:
+        yield from iter_scored_parallel(papers, workers, lookup=lookup,
+                                        store=cache.store if cache is not None else None,
+                                        on_scored=on_scored)
+        return
+    for paper in papers:
+        outcome = None
+        if cache is not None and not force_refresh:
+            outcome, scored = cache.lookup(paper)
+        if outcome != HIT:
+            scored = (score or score_paper)(paper)
+            if cache is not None:
+                cache.store(paper, scored)
+        if on_scored is not None:
+            on_scored(paper, scored)
+        if scored is not None:
+            yield scored
+
+
+def analyze_with_cache(papers, cache: Optional[PaperCache], force_refresh: bool = False) -> List[PaperAnalysis]:
+    """Fully analyzed list form of ``iter_scored_with_cache``."""
+    return [scored.to_analysis() for scored in iter_scored_with_cache(papers, cache, force_refresh)]
+
+
+def _load_scored(payload: Optional[str], paper) -> Optional[ScoredPaper]:
+    if payload is None:
+        return None
+    fields = json.loads(payload)
+    return ScoredPaper(summary=paper.summary, **{name: fields[name] for name in ScoredPaper.SCORED_FIELDS})
+
+
+def _hit_rate(counts: dict) -> float:
+    lookups = sum(counts.get(name, 0) for name in (HIT, MISS, REVISED, STALE))
+    return round(counts.get(HIT, 0) / lookups, 4) if lookups else 0.0
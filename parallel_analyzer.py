@@ -0,0 +1,80 @@
+"""
+Parallel Analyzer: score papers across a process pool for large backfills.
+"""
+
+import time
+import collections
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import metrics
+from content_analyzer import KEYWORD_MATCHER, PaperFeatures, ScoredPaper, score_features
+
+CHUNK_SIZE = 500
+
+# The pool starts while fetch and metrics threads run; forking a threaded process can
+# leave a child blocked on a lock one of them held, so workers never start by fork
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# (title, summary, author count): all a worker needs to score a paper
+Payload = Tuple[str, str, int]
+
+
+def _score_payloads(payloads: List[Payload]) -> List[Optional[Tuple[int, int]]]:
+    """Worker side: (score, grade) per payload, None for papers that are not relevant."""
+    return [
+        score_features(PaperFeatures(KEYWORD_MATCHER.scan(title, summary), n_authors))
+        for title, summary, n_authors in payloads
+    ]
+
+
+def iter_scored_parallel(papers: Iterable, workers: int, chunk_size: int = CHUNK_SIZE,
+                         lookup: Optional[Callable] = None,
+                         store: Optional[Callable] = None,
+                         on_scored: Optional[Callable] = None) -> Iterator[ScoredPaper]:
+    """Like ``iter_scored``, with the keyword scan and grading spread over ``workers`` processes.
+
+    Papers are read in chunks of ``chunk_size``; only their title, summary and
+    author count are sent to the workers, and the ``ScoredPaper`` is rebuilt
+    here from the returned score and grade. Results are yielded in input
+    order, so the output is identical to the serial path. At most two chunks
+    per worker are in flight, which bounds memory on an unbounded stream.
+
+    ``lookup(paper)`` may return ``(True, scored_or_None)`` to skip scoring a
+    paper (a cache hit); ``store(paper, scored)`` is called for every paper
+    that was scored and ``on_scored(paper, scored)`` for every paper.
+    """
+    in_flight = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD)) as pool:
+        iterator = iter(papers)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if chunk:
+                known = [lookup(paper) if lookup is not None else (False, None) for paper in chunk]
+                payloads = [(paper.title, paper.summary, len(paper.authors))
+                            for paper, (found, _) in zip(chunk, known) if not found]
+                in_flight.append((chunk, known, pool.submit(_score_payloads, payloads)))
+            if not in_flight:
+                break
+            if chunk and len(in_flight) < 2 * workers:
+                continue
+            chunk_papers, known, future = in_flight.popleft()
+            started = time.perf_counter()
+            results = future.result()
+            # The scoring itself happens in the workers; this is the time spent waiting for it
+            metrics.add_time('scoring_wait', time.perf_counter() - started)
+            metrics.count('papers_scored', len(results))
+            metrics.count('papers_filtered', results.count(None))
+            results = iter(results)
+            for paper, (found, scored) in zip(chunk_papers, known):
+                if not found:
+                    result = next(results)
+                    scored = ScoredPaper.from_paper(paper, *result) if result is not None else None
+                    if store is not None:
+                        store(paper, scored)
+                if on_scored is not None:
+                    on_scored(paper, scored)
+                if scored is not None:
+                    yield scored
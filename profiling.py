@@ -0,0 +1,139 @@
+"""
+Profiling: per-stage cProfile and tracemalloc capture with a ranked hotspot summary, switched on per run.
+"""
+
+import io
+import os
+import cProfile
+import pstats
+import logging
+import datetime
+import threading
+import contextlib
+import tracemalloc
+from typing import List, Optional
+
+# The run being profiled, if any; without one ``stage`` is a null context, so profiling off costs nothing
+_current: Optional['RunProfiler'] = None
+
+
+class RunProfiler:
+    """Profiles each stage of one run and writes the results under ``output_dir``.
+
+    Every stage gets a ``<stage>.prof`` dump (open it with ``pstats`` or
+    snakeviz) covering the stage's thread and any threads it starts, such as
+    the collector's fetch workers; scoring worker processes are not included.
+    tracemalloc records the allocations made during the stage that are still
+    held when it ends. ``hotspots.txt`` ranks, per stage, the top functions by
+    cumulative and by own time and the top allocation sites.
+    """
+
+    def __init__(self, output_dir: str, top: int = 25, frames: int = 1):
+        self.output_dir = output_dir
+        self.top = top
+        self.frames = frames
+        self.sections: List[str] = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        os.makedirs(self.output_dir, exist_ok=True)
+        thread_profiles = []
+        lock = threading.Lock()
+
+        def profile_new_thread(frame, event, arg):
+            # Runs once, as the first profile event of each thread started during the stage
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # one profiler per process on newer Pythons, which already sees every thread
+                return
+            with lock:
+                thread_profiles.append(profile)
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        threading.setprofile(profile_new_thread)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            threading.setprofile(None)
+            after = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
+            stats = pstats.Stats(profile)
+            with lock:
+                for thread_profile in thread_profiles:
+                    stats.add(thread_profile)
+            path = os.path.join(self.output_dir, f'{name}.prof')
+            stats.dump_stats(path)
+            self.sections.append(self._summarize(name, stats, 1 + len(thread_profiles),
+                                                 after.compare_to(before, 'traceback'), peak))
+            logging.info('Profile of stage %s written to %s', name, path)
+
+    def write_summary(self) -> str:
+        path = os.path.join(self.output_dir, 'hotspots.txt')
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.sections))
+        return path
+
+    def _summarize(self, name: str, stats: pstats.Stats, threads: int, allocations, peak: int) -> str:
+        out = io.StringIO()
+        out.write(f'== Stage {name}: {stats.total_tt:.3f}s profiled across {threads} thread(s), '
+                  f'peak traced memory {peak / 2 ** 20:.1f} MiB ==\n')
+        rows = [(ct, tt, nc, _function(func)) for func, (cc, nc, tt, ct, callers) in stats.stats.items()]
+        for title, column in (('cumulative time', 0), ('own time', 1)):
+            out.write(f'\nTop {self.top} functions by {title}:\n')
+            out.write(f'{"cumulative":>11}{"own":>10}{"calls":>10}  function\n')
+            for ct, tt, nc, function in sorted(rows, key=lambda row: -row[column])[:self.top]:
+                out.write(f'{ct:>10.3f}s{tt:>9.3f}s{nc:>10}  {function}\n')
+        out.write(f'\nTop {self.top} allocation sites (allocated during the stage and still held at its end):\n')
+        out.write(f'{"size":>11}{"blocks":>10}  site\n')
+        growing = sorted((diff for diff in allocations if diff.size_diff > 0), key=lambda d: -d.size_diff)
+        for diff in growing[:self.top]:
+            site = ' <- '.join(f'{frame.filename}:{frame.lineno}' for frame in diff.traceback)
+            out.write(f'{diff.size_diff / 1024:>9.1f}KiB{diff.count_diff:>10}  {site}\n')
+        return out.getvalue()
+
+
+@contextlib.contextmanager
+def run_profiler(config: dict, kind: str = 'pipeline'):
+    """Profile the stages of the enclosed run when ``profile.enabled`` is set; yields the profiler or None."""
+    global _current
+    profile_cfg = config.get('profile', {})
+    if not profile_cfg.get('enabled', False) or _current is not None:
+        yield None
+        return
+    stamp = datetime.datetime.now().strftime('%Y-%m-%d_%H%M%S')
+    profiler = RunProfiler(
+        os.path.join(profile_cfg.get('output_dir', 'cache/profiles'), f'{kind}_{stamp}'),
+        top=profile_cfg.get('top', 25),
+        frames=profile_cfg.get('traceback_frames', 1),
+    )
+    logging.info('Profiling this run into %s', profiler.output_dir)
+    _current = profiler
+    try:
+        yield profiler
+    finally:
+        _current = None
+        if profiler.sections:
+            logging.info('Hotspot summary written to %s', profiler.write_summary())
+
+
+def stage(name: str):
+    profiler = _current
+    return profiler.stage(name) if profiler is not None else contextlib.nullcontext()
+
+
+def _function(func) -> str:
+    filename, line, name = func
+    if filename == '~':  # built-in
+        return name
+    return f'{name} ({os.path.relpath(filename) if filename.startswith(os.getcwd()) else filename}:{line})'
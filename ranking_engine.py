@@ -2,9 +2,136 @@
 Ranking Engine: multi-criteria scoring and selection of top papers.
 """
 
-def rank_analyses(analyses, top_n: int):
-    """Assign ranks and return the top_n analyses sorted by score descending."""
-    sorted_list = sorted(analyses, key=lambda a: a.score, reverse=True)
-    for idx, analysis in enumerate(sorted_list[:top_n], start=1):
+import time
+import heapq
+import datetime
+import itertools
+from typing import Dict, Iterable, Optional
+
+import metrics
+
+# Criteria a ranking can weight, each normalized to [0, 1] before weighting
+CRITERIA = ('score', 'grade', 'recency', 'authors')
+
+DEFAULT_WEIGHTS = {'score': 0.6, 'grade': 0.25, 'recency': 0.1, 'authors': 0.05}
+
+class TopN:
+    """Bounded min-heap that keeps the ``n`` best analyses seen so far in O(log n) per push.
+
+    Ties keep the earlier analysis, exactly like a stable sort by key descending.
+    """
+
+    def __init__(self, n: int, key=lambda a: a.score):
+        self.n = n
+        self.key = key
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, analysis) -> None:
+        # The heap root is the current worst entry: lowest key, latest arrival among equals.
+        entry = (self.key(analysis), -next(self._counter), analysis)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif self.n > 0 and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def ranked(self):
+        """Return the kept analyses best first, with ``rank`` assigned from 1."""
+        best = [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+        for idx, analysis in enumerate(best, start=1):
+            analysis.rank = idx
+        return best
+
+class RankingEngine:
+    """Weighted multi-criteria ranking over keyword score, grade, recency and author count.
+
+    Every criterion is normalized against a fixed range rather than the
+    batch's own min and max, so an analysis' composite score does not depend
+    on which other papers are in the run. That keeps a streamed ranking
+    identical to a batch one and lets the top N be picked in a single pass.
+    Ties are broken by keyword score, grade, date and finally ArXiv id, so
+    the order never depends on the order papers arrived in.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, score_cap: float = 30,
+                 recency_half_life_days: float = 7, author_cap: int = 10,
+                 reference_date: Optional[datetime.date] = None):
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        unknown = set(weights) - set(CRITERIA)
+        if unknown:
+            raise ValueError(f'Unknown ranking criteria: {", ".join(sorted(unknown))}')
+        total = sum(weights.values())
+        if total <= 0:
+            raise ValueError('Ranking weights must sum to a positive number')
+        self.weights = {name: weights.get(name, 0.0) / total for name in CRITERIA}
+        self.score_cap = score_cap
+        self.recency_half_life_days = recency_half_life_days
+        self.author_cap = author_cap
+        self.reference_date = reference_date or datetime.datetime.now(datetime.timezone.utc).date()
+
+    @classmethod
+    def from_config(cls, ranking_cfg: dict,
+                    reference_date: Optional[datetime.date] = None) -> 'RankingEngine':
+        return cls(
+            weights=ranking_cfg.get('weights'),
+            score_cap=ranking_cfg.get('score_cap', 30),
+            recency_half_life_days=ranking_cfg.get('recency_half_life_days', 7),
+            author_cap=ranking_cfg.get('author_cap', 10),
+            reference_date=reference_date,
+        )
+
+    def composite(self, analysis) -> float:
+        """Weighted sum of the normalized criteria, in [0, 1]."""
+        w = self.weights
+        age_days = max(0, (self.reference_date - datetime.date.fromisoformat(analysis.date)).days)
+        return (w['score'] * min(analysis.score, self.score_cap) / self.score_cap
+                + w['grade'] * (analysis.grade - 1) / 9
+                + w['recency'] * 0.5 ** (age_days / self.recency_half_life_days)
+                + w['authors'] * min(analysis.n_authors, self.author_cap) / self.author_cap)
+
+    def key(self, analysis):
+        return (self.composite(analysis), analysis.score, analysis.grade, analysis.date, analysis.arxiv_id)
+
+    def top(self, analyses: Iterable, top_n: int):
+        """Rank any iterable of analyses, holding at most ``top_n`` of them: O(n log top_n)."""
+        return _rank(TopN(top_n, key=self.key), analyses)
+
+def rank_analyses(analyses, top_n: int, engine: Optional[RankingEngine] = None):
+    """Assign ranks and return the top_n analyses, best first.
+
+    Without an ``engine`` analyses are ranked by keyword score alone. ``analyses``
+    may be any iterable, including a generator: only ``top_n`` analyses are
+    held at a time.
+    """
+    if engine is not None:
+        return engine.top(analyses, top_n)
+    return _rank(TopN(top_n), analyses)
+
+def drop_ranked(ranked: list, exclude, top_n: int) -> list:
+    """``ranked`` (best first) without the analyses whose ``arxiv_id`` is in ``exclude``, cut to ``top_n``.
+
+    Rank with spare places when analyses may be excluded after they were
+    ranked, e.g. near-duplicates superseded later in the stream.
+    """
+    kept = [analysis for analysis in ranked if analysis.arxiv_id not in exclude][:top_n]
+    for idx, analysis in enumerate(kept, start=1):
         analysis.rank = idx
-    return sorted_list[:top_n]
\ No newline at end of file
+    return kept
+
+def _rank(top: TopN, analyses: Iterable):
+    # Only the pushes are timed: pulling the next analysis runs the fetching and scoring upstream
+    spent = 0.0
+    pushed = 0
+    for analysis in analyses:
+        started = time.perf_counter()
+        top.push(analysis)
+        spent += time.perf_counter() - started
+        pushed += 1
+    started = time.perf_counter()
+    ranked = top.ranked()
+    metrics.add_time('ranking', spent + time.perf_counter() - started)
+    metrics.count('papers_ranked', pushed)
+    return ranked
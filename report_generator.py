@@ -1,39 +1,151 @@
 """
-Report Generator: format analysis results into structured markdown.
+Report Generator: stream analysis results to markdown, JSONL, JSON and HTML reports, with delta reports.
 """
 
 import os
+import time
+import html
+import json
+import sqlite3
 import datetime
+from dataclasses import fields
+from typing import Dict, Iterable, List, Optional, Sequence
 
+import metrics
 from content_analyzer import PaperAnalysis
 
+FORMATS = ('md', 'jsonl', 'json', 'html')
+
+_FIELDS = [f.name for f in fields(PaperAnalysis)]
+
+
 def generate_report(analyses, output_path: str) -> str:
     """Generate and save a markdown report of the analyses to the output directory."""
-    date_str = datetime.datetime.now().strftime('%Y-%m-%d')
-    filename = f'ai_papers_analysis_{date_str}.md'
-    os.makedirs(output_path, exist_ok=True)
-    filepath = os.path.join(output_path, filename)
+    return write_reports(analyses, output_path, formats=('md',))['md']
+
+
+def write_reports(analyses: Sequence, output_dir: str, formats: Iterable[str] = ('md',),
+                  delta: bool = False, index_path: Optional[str] = None,
+                  now: Optional[datetime.datetime] = None, title: str = 'AI Papers Analysis') -> Dict[str, str]:
+    """Write the ranked analyses in every requested format; returns the path written per format.
+
+    Files are named with the run's date and time, so runs on the same day do
+    not overwrite each other. With ``delta``, a second set of files
+    (``delta_<format>`` keys) lists only the papers no earlier report
+    contained, checked against the report index at ``index_path``; every
+    paper in this report is then added to the index. ``title`` heads every
+    report, followed by the date.
+    """
+    formats = list(dict.fromkeys(formats))
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f'Unknown report formats: {", ".join(sorted(unknown))}')
+    now = now or datetime.datetime.now()
+    date_str = now.strftime('%Y-%m-%d')
+    stamp = now.strftime('%Y-%m-%d_%H%M%S')
+    os.makedirs(output_dir, exist_ok=True)
+
+    heading = f'{title} - {date_str}'
+    summary = f'This report covers the top {len(analyses)} AI papers from ArXiv recent submissions.'
+    paths = {}
+    for fmt in formats:
+        paths[fmt] = _write(fmt, _unique_path(output_dir, f'ai_papers_analysis_{stamp}', fmt),
+                            analyses, heading, summary)
+
+    if delta or index_path:
+        index = ReportIndex(index_path or os.path.join(output_dir, 'report_index.db'))
+        try:
+            if delta:
+                new = index.unseen(analyses)
+                delta_title = f'{title} - New Since Earlier Reports - {date_str}'
+                delta_summary = (f'{len(new)} of the top {len(analyses)} AI papers did not appear '
+                                 f'in any earlier report.')
+                for fmt in formats:
+                    paths[f'delta_{fmt}'] = _write(
+                        fmt, _unique_path(output_dir, f'ai_papers_delta_{stamp}', fmt),
+                        new, delta_title, delta_summary,
+                    )
+            index.record(analyses, os.path.basename(paths[formats[0]]) if formats else '', now)
+        finally:
+            index.close()
+    return paths
+
+
+class ReportIndex:
+    """Every ArXiv id that has appeared in a report, with the first report that listed it."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS reported ('
+            'arxiv_id TEXT PRIMARY KEY, first_report TEXT NOT NULL, first_reported_at TEXT NOT NULL)'
+        )
+
+    def unseen(self, analyses: Iterable) -> List:
+        """The analyses, in order, whose paper no earlier report contained."""
+        return [a for a in analyses
+                if self._conn.execute('SELECT 1 FROM reported WHERE arxiv_id = ?', (a.arxiv_id,)).fetchone() is None]
+
+    def record(self, analyses: Iterable, report: str, when: datetime.datetime) -> None:
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO reported VALUES (?, ?, ?)',
+                [(a.arxiv_id, report, when.isoformat()) for a in analyses],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _unique_path(output_dir: str, stem: str, fmt: str) -> str:
+    path = os.path.join(output_dir, f'{stem}.{fmt}')
+    counter = 2
+    while os.path.exists(path):
+        path = os.path.join(output_dir, f'{stem}_{counter}.{fmt}')
+        counter += 1
+    return path
 
+
+def _write(fmt: str, path: str, analyses: Sequence, title: str, summary: str) -> str:
+    """Stream one report to a temporary file and move it into place once complete."""
+    started = time.perf_counter()
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        _WRITERS[fmt](f, analyses, title, summary)
+    os.replace(tmp_path, path)
+    metrics.add_time(f'report_{fmt}', time.perf_counter() - started)
+    metrics.count('reports_written')
+    return path
+
+
+def _record(analysis) -> dict:
+    record = {name: getattr(analysis, name) for name in _FIELDS}
+    record['use_cases'] = list(record['use_cases'] or [])
+    return record
+
+
+def _write_markdown(f, analyses: Sequence, title: str, summary: str) -> None:
     # Header and executive summary
-    report = [f'# AI Papers Analysis - {date_str}', '', '## Executive Summary', '',
-              f'This report covers the top {len(analyses)} AI papers from ArXiv recent submissions.', '']
+    f.write(f'# {title}\n\n## Executive Summary\n\n{summary}\n\n')
 
     # Top papers table
-    report.append('## Top Papers')
-    report.append('')
-    report.append('| Rank | Date       | Title                           | Grade | Relevance                                   | Link |')
-    report.append('|------|------------|---------------------------------|-------|----------------------------------------------|------|')
+    f.write('## Top Papers\n\n')
+    f.write('| Rank | Date       | Title                           | Grade | Relevance                                   | Link |\n')
+    f.write('|------|------------|---------------------------------|-------|----------------------------------------------|------|\n')
     for a in analyses:
         title_short = (a.title[:30] + '...') if len(a.title) > 30 else a.title
         link = f'[{a.arxiv_id}]({a.url})'
-        report.append(
-            f'| {a.rank:<4} | {a.date:<10} | {title_short:<31} | {a.grade}/10 | {a.relevance:<44} | {link} |'
-        )
+        f.write(f'| {a.rank:<4} | {a.date:<10} | {title_short:<31} | {a.grade}/10 | {a.relevance:<44} | {link} |\n')
 
     # Detailed analysis
-    report.extend(['', '## Detailed Analysis', ''])
+    f.write('\n## Detailed Analysis\n')
     for a in analyses:
-        report.extend([
+        f.write('\n'.join([
+            '',
             f'### {a.rank}. {a.title}',
             f'**ArXiv ID**: [{a.arxiv_id}]({a.url})   **Date**: {a.date}',
             '',
@@ -47,11 +159,54 @@ def generate_report(analyses, output_path: str) -> str:
             f'- **Business Applications**: {a.business_applications}',
             f'- **Grade**: {a.grade}/10',
             f'- **Justification**: {a.justification}',
-            '', '---', ''
-        ])
+            '', '---',
+        ]))
+        f.write('\n')
+
+
+def _write_jsonl(f, analyses: Sequence, title: str, summary: str) -> None:
+    for a in analyses:
+        f.write(json.dumps(_record(a), ensure_ascii=False))
+        f.write('\n')
+
+
+def _write_json(f, analyses: Sequence, title: str, summary: str) -> None:
+    header = json.dumps({'title': title, 'summary': summary, 'count': len(analyses)}, ensure_ascii=False)
+    f.write(header[:-1] + ', "papers": [')
+    for i, a in enumerate(analyses):
+        f.write('\n  ' if i == 0 else ',\n  ')
+        f.write(json.dumps(_record(a), ensure_ascii=False))
+    f.write('\n]}\n')
+
+
+def _write_html(f, analyses: Sequence, title: str, summary: str) -> None:
+    e = html.escape
+    f.write('<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{e(title)}</title>\n'
+            '<style>body{font-family:sans-serif;max-width:60em;margin:auto}'
+            'table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:.3em .6em;text-align:left}</style>\n'
+            f'</head>\n<body>\n<h1>{e(title)}</h1>\n<h2>Executive Summary</h2>\n<p>{e(summary)}</p>\n')
+    f.write('<h2>Top Papers</h2>\n<table>\n<tr><th>Rank</th><th>Date</th><th>Title</th>'
+            '<th>Grade</th><th>Relevance</th><th>Link</th></tr>\n')
+    for a in analyses:
+        f.write(f'<tr><td>{a.rank}</td><td>{e(a.date)}</td><td>{e(a.title)}</td><td>{a.grade}/10</td>'
+                f'<td>{e(a.relevance)}</td><td><a href="{e(a.url)}">{e(a.arxiv_id)}</a></td></tr>\n')
+    f.write('</table>\n<h2>Detailed Analysis</h2>\n')
+    for a in analyses:
+        use_cases = ''.join(f'<li>{e(u)}</li>' for u in a.use_cases[:3])
+        f.write(
+            f'<section id="{e(a.arxiv_id)}">\n<h3>{a.rank}. {e(a.title)}</h3>\n'
+            f'<p><strong>ArXiv ID</strong>: <a href="{e(a.url)}">{e(a.arxiv_id)}</a> '
+            f'<strong>Date</strong>: {e(a.date)}</p>\n<ul>\n'
+            f'<li><strong>Description</strong>: {e(a.description)}</li>\n'
+            f'<li><strong>Relevance</strong>: {e(a.relevance)}</li>\n'
+            f'<li><strong>Top 3 Use Cases</strong>:<ol>{use_cases}</ol></li>\n'
+            f'<li><strong>Business Problems Solved</strong>: {e(a.business_problems)}</li>\n'
+            f'<li><strong>Business Applications</strong>: {e(a.business_applications)}</li>\n'
+            f'<li><strong>Grade</strong>: {a.grade}/10</li>\n'
+            f'<li><strong>Justification</strong>: {e(a.justification)}</li>\n</ul>\n</section>\n'
+        )
+    f.write('</body>\n</html>\n')
 
-    # Write to file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(report))
 
-    return filepath
+_WRITERS = {'md': _write_markdown, 'jsonl': _write_jsonl, 'json': _write_json, 'html': _write_html}
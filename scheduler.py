@@ -1,24 +1,359 @@
 """
-Scheduler: schedule periodic execution of the agent pipeline.
+Scheduler: run the agent pipeline periodically in a supervised worker, one run at a time.
 """
 
-import time
+import os
+import sys
+import json
+import fcntl
+import random
+import signal
+import hashlib
 import logging
-import schedule
+import datetime
+import threading
+import multiprocessing
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from arxiv_collector import HighWaterMark
+from content_analyzer import ScoredPaper
+from llm_analyzer import ENRICHED_FIELDS
+
+# Stages of a pipeline run, in order; a checkpoint is saved after each one
+STAGES = ('collected', 'enriched', 'reported')
+
+# Config sections that do not change what a run produces, so changing them does not invalidate a checkpoint
+_OPERATIONAL_SECTIONS = ('schedule', 'service', 'metrics', 'profile')
+
+# Worker exit status when another run holds the lock (EX_TEMPFAIL)
+EXIT_LOCKED = 75
+
+# Outcomes of Scheduler.run_once
+OK, FAILED, TIMED_OUT, LOCKED = 'ok', 'failed', 'timed out', 'locked'
+
+
+class RunLock:
+    """Exclusive lock file held for the duration of one pipeline run.
+
+    The lock is an ``flock`` on the file rather than the file's existence, so
+    the operating system releases it when the holder exits, however it exits,
+    and a crashed or killed run never leaves a stale lock behind. The holder
+    writes its pid into the file for the benefit of whoever finds it locked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open(self.path, 'a+', encoding='utf-8')
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(f'{os.getpid()}\n')
+        f.flush()
+        self._file = f
+        return True
+
+    def holder(self) -> str:
+        """The pid recorded by the current holder, if any."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            return ''
+
+    def release(self) -> None:
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'RunLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    @property
+    def acquired(self) -> bool:
+        return self._file is not None
+
+
+class RunCheckpoint:
+    """Progress of one pipeline run, saved as JSON after every stage.
+
+    After collection it holds the ranked top N (ranking fields and abstract),
+    that of every interest profile, the counters and the fetch high-water
+    marks that are only saved once the run succeeds; after enrichment also
+    the write-up of each paper; after the report its path. A retried run
+    picks up after the last saved stage. A checkpoint only applies to the
+    configuration it was started with, and one older than ``max_age`` is
+    discarded so a new cycle starts afresh.
+    """
+
+    def __init__(self, path: str, params: dict, max_age: Optional[datetime.timedelta] = None):
+        self.path = path
+        self.params = params
+        self.stage: Optional[str] = None
+        self.top: List[ScoredPaper] = []
+        self.profiles: Dict[str, List[ScoredPaper]] = {}
+        self.counts = {'fetched': 0, 'relevant': 0}
+        self.marks: Dict[str, HighWaterMark] = {}
+        self.report_path: Optional[str] = None
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            started = datetime.datetime.fromisoformat(saved['started'])
+            if saved.get('params') != params:
+                logging.warning('Ignoring run checkpoint %s: it was started with other settings', path)
+            elif max_age is not None and self.started - started > max_age:
+                logging.info('Ignoring run checkpoint %s from %s: too old to resume', path, saved['started'])
+            else:
+                self.stage = saved['stage']
+                self.started = started
+                self.top = [_load_paper(entry, rank) for rank, entry in enumerate(saved['top'], 1)]
+                self.profiles = {name: [_load_paper(entry, rank) for rank, entry in enumerate(top, 1)]
+                                 for name, top in saved.get('profiles', {}).items()}
+                self.counts = saved['counts']
+                self.marks = {cat: HighWaterMark(**mark) for cat, mark in saved['marks'].items()}
+                self.report_path = saved.get('report_path')
+
+    @classmethod
+    def for_config(cls, path: str, config: dict,
+                   max_age: Optional[datetime.timedelta] = None) -> 'RunCheckpoint':
+        relevant = {name: section for name, section in config.items() if name not in _OPERATIONAL_SECTIONS}
+        digest = hashlib.sha1(json.dumps(relevant, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return cls(path, {'config': digest}, max_age)
+
+    def reached(self, stage: str) -> bool:
+        return self.stage is not None and STAGES.index(self.stage) >= STAGES.index(stage)
+
+    def complete(self, stage: str, top=None, counts: Optional[dict] = None,
+                 marks: Optional[Dict[str, HighWaterMark]] = None, report_path: Optional[str] = None,
+                 profiles: Optional[Dict[str, list]] = None) -> None:
+        """Record ``stage`` as finished, along with whatever it produced, and save."""
+        self.stage = stage
+        if top is not None:
+            self.top = list(top)
+        if profiles is not None:
+            self.profiles = {name: list(ranked) for name, ranked in profiles.items()}
+        if counts is not None:
+            self.counts = dict(counts)
+        if marks is not None:
+            self.marks = dict(marks)
+        if report_path is not None:
+            self.report_path = report_path
+        self.save()
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        enriched = self.reached('enriched')
+        payload = {
+            'params': self.params,
+            'stage': self.stage,
+            'started': self.started.isoformat(),
+            'counts': self.counts,
+            'marks': {cat: asdict(mark) for cat, mark in self.marks.items()},
+            'report_path': self.report_path,
+            'top': [_dump_paper(paper, enriched) for paper in self.top],
+            'profiles': {name: [_dump_paper(paper, enriched) for paper in ranked]
+                         for name, ranked in self.profiles.items()},
+        }
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        self.stage, self.top, self.marks, self.report_path = None, [], {}, None
+        self.profiles = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _dump_paper(paper: ScoredPaper, enriched: bool) -> dict:
+    entry = dict(paper.scored_fields(), summary=paper.summary)
+    if enriched:
+        entry.update({name: getattr(paper, name) for name in ENRICHED_FIELDS})
+    return entry
+
+
+def _load_paper(entry: dict, rank: int) -> ScoredPaper:
+    entry = dict(entry)
+    enriched = {name: entry.pop(name) for name in ENRICHED_FIELDS if name in entry}
+    paper = ScoredPaper(**entry)
+    paper.rank = rank
+    for name, value in enriched.items():
+        setattr(paper, name, value)
+    return paper
+
+
+class Scheduler:
+    """Runs the pipeline every ``interval_hours`` plus a random jitter, in a worker process.
+
+    Between runs it sleeps until the next due time rather than polling. Each
+    run gets a fresh worker with a hard ``timeout``; a run that fails or times
+    out is retried after ``retry_delay`` and resumes from the stage checkpoint
+    it left behind. The time of the last run is saved, so a restarted
+    scheduler keeps to the interval instead of running immediately.
+    """
+
+    def __init__(self, config: dict, interval_hours: Optional[float] = None):
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._worker = None
+        self.next_run: Optional[datetime.datetime] = None
+        self.configure(config, interval_hours)
+
+    def configure(self, config: dict, interval_hours: Optional[float] = None) -> None:
+        """Apply the ``schedule`` section of ``config``, e.g. after it was reloaded."""
+        schedule_cfg = config.get('schedule', {})
+        self.config = config
+        self.interval = datetime.timedelta(hours=interval_hours or schedule_cfg.get('interval_hours', 48))
+        self.jitter = datetime.timedelta(minutes=schedule_cfg.get('jitter_minutes', 10))
+        self.timeout = 60 * schedule_cfg.get('timeout_minutes', 120)
+        self.max_retries = schedule_cfg.get('max_retries', 2)
+        self.retry_delay = 60 * schedule_cfg.get('retry_delay_minutes', 15)
+        self.lock_path = schedule_cfg.get('lock_path', 'cache/pipeline.lock')
+        self.state_path = schedule_cfg.get('state_path', 'cache/scheduler_state.json')
+        self.checkpoint_path = schedule_cfg.get('checkpoint_path', 'cache/run_checkpoint.json')
+
+    def last_run(self) -> Optional[datetime.datetime]:
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return datetime.datetime.fromisoformat(json.load(f)['last_run'])
+
+    def next_due(self) -> datetime.datetime:
+        """When the next run is due: one interval after the last run (or now), plus jitter."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        last_run = self.last_run()
+        due = max(last_run + self.interval, now) if last_run else now
+        return due + self.jitter * random.random()
+
+    def run_forever(self) -> None:
+        self._stop_on_signals()
+        logging.info('Scheduler started: interval %s, jitter up to %s, timeout %ds',
+                     self.interval, self.jitter, self.timeout)
+        while not self._stop.is_set():
+            self.next_run = self.next_due()
+            logging.info('Next run due at %s', self.next_run.astimezone().strftime('%Y-%m-%d %H:%M:%S %Z'))
+            if self._sleep_until(self.next_run):
+                self.run_cycle()
+        self.next_run = None
+        logging.info('Scheduler stopped')
+
+    def run_cycle(self) -> str:
+        """One scheduled run, retried on failure or timeout; records the run time when done."""
+        started = datetime.datetime.now(datetime.timezone.utc)
+        outcome = FAILED
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                logging.info('Retrying in %ds (attempt %d of %d)', self.retry_delay, attempt + 1,
+                             self.max_retries + 1)
+                self._sleep_until(datetime.datetime.now(datetime.timezone.utc)
+                                  + datetime.timedelta(seconds=self.retry_delay))
+                if self._stop.is_set():
+                    return outcome
+            outcome = self.run_once()
+            if outcome in (OK, LOCKED) or self._stop.is_set():
+                break
+        if outcome not in (OK, LOCKED):
+            logging.error('Run failed after %d attempts; trying again at the next interval', attempt + 1)
+        self._save_state(started)
+        return outcome
+
+    def run_once(self) -> str:
+        """Run the pipeline once in a supervised worker process."""
+        context = multiprocessing.get_context('spawn')
+        self._worker = context.Process(
+            target=_run_worker, name='pipeline-run',
+            args=(self.config, self.lock_path, self.checkpoint_path, self.interval),
+        )
+        self._worker.start()
+        self._worker.join(self.timeout)
+        try:
+            if self._worker.is_alive():
+                logging.error('Run exceeded the %ds timeout; stopping it', self.timeout)
+                _terminate(self._worker)
+                return TIMED_OUT
+            if self._worker.exitcode == 0:
+                return OK
+            if self._worker.exitcode == EXIT_LOCKED:
+                logging.warning('Skipping run: another run holds %s (pid %s)',
+                                self.lock_path, RunLock(self.lock_path).holder() or 'unknown')
+                return LOCKED
+            logging.error('Run failed (worker exit status %s)', self._worker.exitcode)
+            return FAILED
+        finally:
+            self._worker = None
+
+    def stop(self) -> None:
+        """Stop sleeping and stop any run in progress; its checkpoint is kept for the next run."""
+        self._stop.set()
+        self._wake.set()
+        if self._worker is not None and self._worker.is_alive():
+            self._worker.terminate()
+
+    def _stop_on_signals(self) -> None:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self.stop())
+
+    def _sleep_until(self, when: datetime.datetime) -> bool:
+        """Sleep until ``when``; False if the scheduler was stopped or woken (to re-plan) first."""
+        while not self._stop.is_set():
+            remaining = (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+            if remaining <= 0:
+                return True
+            if self._wake.wait(remaining):
+                self._wake.clear()
+                return False
+        return False
+
+    def _save_state(self, last_run: datetime.datetime) -> None:
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.state_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'last_run': last_run.isoformat()}, f)
+        os.replace(tmp_path, self.state_path)
+
+
+def _terminate(process, grace: float = 10) -> None:
+    process.terminate()
+    process.join(grace)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def _run_worker(config: dict, lock_path: str, checkpoint_path: str, max_age: datetime.timedelta) -> None:
+    """Body of the worker process: take the lock and run the pipeline from its checkpoint."""
+    from main import run_pipeline  # imported here as main imports this module for --daemon
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)-8s %(message)s')
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    with RunLock(lock_path) as lock:
+        if not lock.acquired:
+            sys.exit(EXIT_LOCKED)
+        logging.info('Scheduled job: running pipeline')
+        run_pipeline(config, checkpoint=RunCheckpoint.for_config(checkpoint_path, config, max_age))
 
-from main import run_pipeline
 
 def run_scheduler(interval_hours: int, config: dict):
     """Schedule the agent pipeline to run every interval_hours."""
-    def job():
-        logging.info('Scheduled job: running pipeline')
-        try:
-            run_pipeline(config)
-        except Exception as e:
-            logging.error('Pipeline error: %s', e)
-
-    schedule.every(interval_hours).hours.do(job)
-    logging.info('Scheduler started: interval %d hours', interval_hours)
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
\ No newline at end of file
+    Scheduler(config, interval_hours).run_forever()
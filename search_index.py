@@ -0,0 +1,155 @@
+"""
+Search Index: local SQLite FTS5 full-text index over every collected paper and its analysis.
+"""
+
+import os
+import sqlite3
+import datetime
+from typing import List, Optional
+
+from arxiv_metadata import parse_arxiv_id
+from content_analyzer import KEYWORD_MATCHER, ScoredPaper
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id        INTEGER PRIMARY KEY,
+    arxiv_id  TEXT    NOT NULL UNIQUE,  -- base id without the version suffix
+    version   INTEGER NOT NULL,
+    title     TEXT    NOT NULL,
+    published TEXT    NOT NULL,         -- YYYY-MM-DD
+    grade     INTEGER,                  -- NULL if the paper did not pass relevance filtering
+    score     INTEGER,
+    keywords  TEXT    NOT NULL,         -- AI keywords hit, comma separated
+    url       TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_published ON documents (published);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, summary, keywords, tokenize = 'porter unicode61'
+);
+"""
+
+# bm25 column weights for title, summary and keywords
+_BM25_WEIGHTS = (5.0, 1.0, 3.0)
+
+
+class SearchIndex:
+    """Full-text index of titles, abstracts and keyword hits, with grade and date for filtering.
+
+    ``add`` is cheap enough to call for every paper as it streams through
+    analysis; a paper already indexed at the same version, grade and score is
+    skipped. Queries use FTS5 syntax (``rag AND "long context"``, ``agent*``)
+    and are ranked by BM25 with title and keyword matches weighted up.
+    """
+
+    COMMIT_EVERY = 500
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+        self._pending = 0
+
+    def add(self, paper, scored: Optional[ScoredPaper] = None) -> None:
+        """Index ``paper`` with its scoring, or with no grade if it was filtered out."""
+        arxiv_id, version = parse_arxiv_id(paper.entry_id)
+        grade = scored.grade if scored is not None else None
+        score = scored.score if scored is not None else None
+        row = self._conn.execute(
+            'SELECT id, version, grade, score FROM documents WHERE arxiv_id = ?', (arxiv_id,)
+        ).fetchone()
+        if row is not None and row[1:] == (version, grade, score):
+            return
+        # Filtered-out papers hit no AI keyword by definition
+        keywords = ', '.join(sorted(scored.features.hits.text.intersection(KEYWORD_MATCHER.weights))) \
+            if scored is not None else ''
+        values = (arxiv_id, version, paper.title, paper.published.date().isoformat(),
+                  grade, score, keywords, paper.entry_id)
+        if row is None:
+            doc_id = self._conn.execute(
+                'INSERT INTO documents (arxiv_id, version, title, published, grade, score, keywords, url) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', values,
+            ).lastrowid
+        else:
+            doc_id = row[0]
+            self._conn.execute(
+                'UPDATE documents SET arxiv_id = ?, version = ?, title = ?, published = ?, grade = ?, '
+                'score = ?, keywords = ?, url = ? WHERE id = ?', values + (doc_id,),
+            )
+            self._conn.execute('DELETE FROM documents_fts WHERE rowid = ?', (doc_id,))
+        self._conn.execute(
+            'INSERT INTO documents_fts (rowid, title, summary, keywords) VALUES (?, ?, ?, ?)',
+            (doc_id, paper.title, paper.summary, keywords),
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.flush()
+
+    def add_skipped(self, paper) -> None:
+        """Index ``paper``, held back from analysis, with no grade unless this version is already indexed."""
+        arxiv_id, version = parse_arxiv_id(paper.entry_id)
+        row = self._conn.execute('SELECT version FROM documents WHERE arxiv_id = ?', (arxiv_id,)).fetchone()
+        if row is None or row[0] < version:
+            self.add(paper)
+
+    def search(self, query: str, limit: int = 20, since: Optional[datetime.date] = None,
+               until: Optional[datetime.date] = None, min_grade: Optional[int] = None) -> List[dict]:
+        """Best-matching papers for ``query``, optionally limited to a date range and minimum grade."""
+        sql = [
+            'SELECT d.arxiv_id, d.title, d.published, d.grade, d.score, d.keywords, d.url,',
+            '       bm25(documents_fts, ?, ?, ?) AS rank',
+            'FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid',
+            'WHERE documents_fts MATCH ?',
+        ]
+        params = list(_BM25_WEIGHTS)
+        params.append(query)
+        if since is not None:
+            sql.append('AND d.published >= ?')
+            params.append(since.isoformat())
+        if until is not None:
+            sql.append('AND d.published <= ?')
+            params.append(until.isoformat())
+        if min_grade is not None:
+            sql.append('AND d.grade >= ?')
+            params.append(min_grade)
+        sql.append('ORDER BY rank LIMIT ?')
+        params.append(limit)
+        try:
+            rows = self._conn.execute('\n'.join(sql), params).fetchall()
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax (e.g. "retrieval-augmented"): search the words as plain terms
+            params[3] = _plain_query(query)
+            rows = self._conn.execute('\n'.join(sql), params).fetchall()
+        columns = ('arxiv_id', 'title', 'published', 'grade', 'score', 'keywords', 'url', 'rank')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def flush(self) -> None:
+        self._conn.commit()
+        self._pending = 0
+
+    def optimize(self) -> None:
+        """Merge the FTS5 index segments; worth running after a large backfill."""
+        with self._conn:
+            self._conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+def open_index(config: dict) -> Optional[SearchIndex]:
+    """Open the index described by the ``search`` section of the config, or None if disabled."""
+    search_cfg = config.get('search', {})
+    if not search_cfg.get('enabled', True):
+        return None
+    return SearchIndex(search_cfg.get('path', 'cache/search.db'))
+
+
+def _plain_query(query: str) -> str:
+    words = ''.join(ch if ch.isalnum() else ' ' for ch in query).split()
+    return ' '.join(f'"{word}"' for word in words) or '""'
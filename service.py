@@ -0,0 +1,273 @@
+"""
+Service: resident agent process that keeps clients and caches warm between runs, with a localhost control interface.
+"""
+
+import os
+import hmac
+import json
+import logging
+import datetime
+import ipaddress
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from main import run_pipeline
+from paper_cache import open_cache
+from scheduler import FAILED, LOCKED, OK, RunCheckpoint, RunLock, Scheduler
+from search_index import open_index
+
+
+class WarmState:
+    """Paper cache and search index kept open from one run to the next.
+
+    They are reopened only when the ``cache`` or ``search`` settings change.
+    The paper cache keeps up to ``memory_entries`` recently seen papers in
+    memory (least recently used are evicted first), so a refresh over mostly
+    known papers rarely reaches SQLite. Everything here belongs to the run
+    thread: SQLite connections may not cross threads.
+    """
+
+    def __init__(self):
+        self.cache = None
+        self.index = None
+        self._key = None
+
+    def prepare(self, config: dict, memory_entries: int = 0) -> None:
+        """Make the state match ``config`` and start a new cache session for the next run."""
+        key = json.dumps([config.get('cache', {}), config.get('search', {}), memory_entries],
+                         sort_keys=True, default=str)
+        if key != self._key:
+            self.close()
+            self.cache = open_cache(config, memory_entries)
+            self.index = open_index(config)
+            self._key = key
+        elif self.cache is not None:
+            self.cache.reset_session()
+
+    def close(self) -> None:
+        for resource in (self.cache, self.index):
+            if resource is not None:
+                resource.close()
+        self.cache = self.index = None
+        self._key = None
+
+
+class Service(Scheduler):
+    """Scheduler that runs the pipeline in-process, keeping its state warm, and takes requests over HTTP.
+
+    Runs execute one at a time on a single run thread that owns the warm
+    state; the keyword automaton and the pooled HTTP session are process-wide
+    already. ``load_config`` is called again on ``POST /reload``, so
+    ``config.yaml`` changes apply from the next run without a restart. Since
+    runs share the process, ``schedule.timeout_minutes`` cannot be enforced
+    here; use ``--daemon`` where a hard timeout matters more than warm state.
+
+    Control interface:
+        GET  /status                           state, stage and live counts, last run, next run
+        POST /run[?force_refresh=1][&wait=1]   start a run; 409 if one is already running
+        POST /reload                           re-read config.yaml
+
+    Requests carrying an ``Origin`` header, which browsers add to requests
+    from web pages, are refused. With a token (the variable named by
+    ``service.token_env``) every request must send ``Authorization: Bearer
+    <token>``. Without one, POSTs must send an ``X-Requested-By`` header,
+    which a page cannot add to a cross-origin request without a preflight
+    this server does not answer, and the service only binds to loopback.
+    """
+
+    def __init__(self, load_config: Callable[[], dict]):
+        self._load_config = load_config
+        config = load_config()
+        super().__init__(config)
+        service_cfg = config.get('service', {})
+        host = service_cfg.get('host', '127.0.0.1')
+        if not self.token and not _is_loopback(host):
+            raise ValueError(f'service.host {host!r} is not a loopback address; set a token in '
+                             f'${service_cfg.get("token_env", "ARXIV_AGENT_TOKEN")} to expose the control interface')
+        self._server = ThreadingHTTPServer((host, service_cfg.get('port', 8770)), self._handler_class())
+        self._server.daemon_threads = True
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-run')
+        self._busy = threading.Lock()  # held from the moment a run is accepted until it finishes
+        self._warm = WarmState()
+        self._progress: dict = {}
+        self.status = {'state': 'idle', 'runs': 0, 'last_run': None,
+                       'config_loaded_at': _now().isoformat()}
+
+    def configure(self, config: dict, interval_hours: Optional[float] = None) -> None:
+        super().configure(config, interval_hours)
+        service_cfg = config.get('service', {})
+        self.scheduled = service_cfg.get('scheduled', True)
+        self.memory_entries = service_cfg.get('memory_entries', 100000)
+        self.token = os.getenv(service_cfg.get('token_env', 'ARXIV_AGENT_TOKEN')) or None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def serve_forever(self) -> None:
+        threading.Thread(target=self._server.serve_forever, name='service-control', daemon=True).start()
+        logging.info('Control interface listening at %s (GET /status, POST /run, POST /reload)', self.url)
+        # Open the caches before the first request rather than during it
+        self._executor.submit(self._warm.prepare, self.config, self.memory_entries)
+        try:
+            if self.scheduled:
+                self.run_forever()
+            else:
+                self._stop_on_signals()
+                self._stop.wait()
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+            self._executor.submit(self._warm.close)
+            self._executor.shutdown(wait=True)
+            logging.info('Service stopped')
+
+    def submit(self, force_refresh: bool = False, trigger: str = 'request') -> Optional[Future]:
+        """Queue a run on the run thread; None if a run is already queued or in progress."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        self.status.update(state='running', trigger=trigger, run_started=_now().isoformat())
+        self._progress = {'stage': 'starting'}
+        return self._executor.submit(self._run, force_refresh)
+
+    def run_once(self) -> str:
+        future = self.submit(trigger='schedule')
+        if future is None:
+            logging.warning('Skipping scheduled run: a requested run is in progress')
+            return LOCKED
+        return future.result()
+
+    def reload(self) -> None:
+        """Re-read the configuration; it applies from the next run, and the next due time is re-planned."""
+        self.configure(self._load_config())
+        self.status['config_loaded_at'] = _now().isoformat()
+        self._wake.set()
+        logging.info('Configuration reloaded')
+
+    def snapshot(self) -> dict:
+        status = dict(self.status)
+        if status['state'] == 'running':
+            status['stage'] = self._progress.get('stage')
+            status['counts'] = dict(self._progress.get('counts', {}))
+        status['next_run'] = self.next_run.isoformat() if self.next_run else None
+        return status
+
+    def _run(self, force_refresh: bool) -> str:
+        config = self.config
+        started = _now()
+        outcome, report_path, error = FAILED, None, None
+        try:
+            with RunLock(self.lock_path) as lock:
+                if not lock.acquired:
+                    logging.warning('Skipping run: another run holds %s (pid %s)',
+                                    self.lock_path, lock.holder() or 'unknown')
+                    outcome = LOCKED
+                else:
+                    self._warm.prepare(config, self.memory_entries)
+                    checkpoint = RunCheckpoint.for_config(self.checkpoint_path, config, self.interval)
+                    if force_refresh:
+                        checkpoint.clear()
+                    report_path = run_pipeline(config, force_refresh=force_refresh, checkpoint=checkpoint,
+                                               warm=self._warm, progress=self._progress)
+                    outcome = OK
+        except Exception as exc:
+            logging.exception('Run failed')
+            error = f'{type(exc).__name__}: {exc}'
+        finally:
+            finished = _now()
+            self.status.update(
+                state='idle', runs=self.status['runs'] + 1,
+                last_run={'outcome': outcome, 'trigger': self.status.get('trigger'),
+                          'started': started.isoformat(), 'finished': finished.isoformat(),
+                          'seconds': round((finished - started).total_seconds(), 2),
+                          'counts': dict(self._progress.get('counts', {})),
+                          'report_path': report_path, 'error': error},
+            )
+            self._busy.release()
+        return outcome
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if not self._authorized(changes_state=False):
+                    return
+                if urlsplit(self.path).path.rstrip('/') == '/status':
+                    self._reply(200, service.snapshot())
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if not self._authorized(changes_state=True):
+                    return
+                url = urlsplit(self.path)
+                query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                path = url.path.rstrip('/')
+                if path == '/run':
+                    future = service.submit(force_refresh=_flag(query.get('force_refresh')))
+                    if future is None:
+                        self._reply(409, {'error': 'a run is already in progress', 'status': service.snapshot()})
+                    elif _flag(query.get('wait')):
+                        future.result()
+                        self._reply(200, service.snapshot()['last_run'])
+                    else:
+                        self._reply(202, {'accepted': True, 'status': service.snapshot()})
+                elif path == '/reload':
+                    try:
+                        service.reload()
+                    except Exception as exc:  # a broken config.yaml must not take the service down
+                        self._reply(400, {'error': f'{type(exc).__name__}: {exc}'})
+                    else:
+                        self._reply(200, {'reloaded': True, 'status': service.snapshot()})
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def _authorized(self, changes_state: bool) -> bool:
+                if self.headers.get('Origin') is not None:
+                    self._reply(403, {'error': 'requests from web pages are not accepted'})
+                    return False
+                token = service.token
+                if token is not None:
+                    supplied = self.headers.get('Authorization', '').encode('utf-8')
+                    if not hmac.compare_digest(supplied, f'Bearer {token}'.encode('utf-8')):
+                        self._reply(401, {'error': 'missing or wrong Authorization: Bearer token'})
+                        return False
+                elif changes_state and self.headers.get('X-Requested-By') is None:
+                    self._reply(403, {'error': 'POST requests need an X-Requested-By header'})
+                    return False
+                return True
+
+            def _reply(self, status: int, body: dict) -> None:
+                payload = json.dumps(body, indent=2).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, fmt, *args):
+                logging.debug('control: ' + fmt, *args)
+
+        return Handler
+
+
+def _is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or '').lower() in ('1', 'true', 'yes')
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)